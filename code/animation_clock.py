@@ -0,0 +1,33 @@
+from settings import ANIMATION_SPEED
+
+
+class AnimationClock:
+    def __init__(self, frames, animation_speed=ANIMATION_SPEED):
+        self.frames = frames
+        self.animation_speed = animation_speed
+        self.frame_index = 0
+        self.image = self.frames[self.frame_index]
+
+    def update(self, dt):
+        self.frame_index += self.animation_speed * dt
+        if self.frame_index >= len(self.frames):
+            self.frame_index = 0
+        self.image = self.frames[int(self.frame_index)]
+
+
+class AnimationClocks:
+    def __init__(self):
+        self.clocks = {}
+
+    def get_clock(self, frames):
+        key = id(frames)
+        if key not in self.clocks:
+            self.clocks[key] = AnimationClock(frames)
+        return self.clocks[key]
+
+    def update(self, dt):
+        for clock in self.clocks.values():
+            clock.update(dt)
+
+    def __len__(self):
+        return len(self.clocks)
@@ -0,0 +1,261 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+from time import perf_counter
+
+import pygame
+from asset_pack import AssetPack
+from atlas import Atlas
+from settings import ASSET_LOADER_WORKERS
+from surface_format import classify_alpha, convert_for_blit
+
+
+def decode_image(image_path):
+    start = perf_counter()
+    try:
+        surface = pygame.image.load(image_path)
+    except pygame.error as error:
+        surface = error
+    return surface, perf_counter() - start
+
+
+def get_surface_size(surface):
+    return surface.get_pitch() * surface.get_height()
+
+
+def get_pixel_owner(surface):
+    # subsurfaces share the pixels of the sheet they were cut from
+    while surface.get_parent() is not None:
+        surface = surface.get_parent()
+    return surface
+
+
+TRANSFORMS = {
+    "flip": lambda surface: pygame.transform.flip(surface, True, False),
+    "scale2x": pygame.transform.scale2x,
+}
+
+
+class AssetLoader:
+    def __init__(self, workers=ASSET_LOADER_WORKERS):
+        self.workers = max(1, min(workers, os.cpu_count() or 1))
+        self.images = {}
+        self.image_paths = {}
+        self.handed_out = set()
+        self.transformed = {}
+        self.transformed_frames = {}
+        self.atlases = []
+        self.alpha_classes = {}
+        self.timings = {}
+        self.pack = None
+
+    def open_pack(self, pack_path):
+        if not path.exists(pack_path):
+            return False
+        try:
+            self.pack = AssetPack(pack_path)
+        except (OSError, ValueError) as error:
+            print(f"Loading images from their files, {error}.")
+            self.pack = None
+        return self.pack is not None
+
+    def get_timing(self, image_path):
+        directory = path.dirname(image_path)
+        if directory not in self.timings:
+            self.timings[directory] = {
+                "files": 0,
+                "unpack": 0.0,
+                "decode": 0.0,
+                "convert": 0.0,
+            }
+        return self.timings[directory]
+
+    def preload(self, image_paths):
+        image_paths = [
+            path.normpath(image_path)
+            for image_path in image_paths
+            if path.normpath(image_path) not in self.images
+        ]
+        # images in an up to date pack only need their pixels copied
+        if self.pack:
+            for image_path in self.pack.get_valid_paths(image_paths):
+                timing = self.get_timing(image_path)
+                timing["files"] += 1
+                start = perf_counter()
+                surface = self.pack.get_surface(image_path)
+                timing["unpack"] += perf_counter() - start
+                start = perf_counter()
+                # the pack already knows the format, so nothing is classified
+                surface = self.convert_image(
+                    image_path, surface, self.pack.get_alpha_class(image_path)
+                )
+                self.images[image_path] = surface
+                self.image_paths[surface] = image_path
+                timing["convert"] += perf_counter() - start
+            image_paths = [
+                image_path
+                for image_path in image_paths
+                if image_path not in self.images
+            ]
+        if not image_paths:
+            return
+
+        # decoding does not need the display, so batches run on worker threads
+        if len(image_paths) == 1:
+            decoded = [decode_image(image_paths[0])]
+        else:
+            with ThreadPoolExecutor(self.workers) as executor:
+                decoded = list(executor.map(decode_image, image_paths))
+
+        # converting to the display format has to happen on the main thread
+        for image_path, (surface, decode_time) in zip(image_paths, decoded):
+            timing = self.get_timing(image_path)
+            timing["files"] += 1
+            timing["decode"] += decode_time
+            start = perf_counter()
+            if isinstance(surface, pygame.Surface):
+                surface = self.convert_image(image_path, surface)
+                self.image_paths[surface] = image_path
+            self.images[image_path] = surface
+            timing["convert"] += perf_counter() - start
+
+    def convert_image(self, image_path, surface, alpha_class=None):
+        # pick the fastest format to blit that still draws the same pixels
+        if alpha_class is None:
+            alpha_class = classify_alpha(surface)
+        self.alpha_classes[image_path] = alpha_class
+        return convert_for_blit(surface, alpha_class)
+
+    def preload_folders(self, folders):
+        image_paths = []
+        for folder in folders:
+            if path.isfile(folder):
+                image_paths.append(folder)
+                continue
+            image_paths.extend(
+                path.join(dirpath, filename)
+                for dirpath, _, filenames in os.walk(path.normpath(folder))
+                for filename in filenames
+            )
+        self.preload(image_paths)
+
+    def preload_folder(self, folder):
+        self.preload_folders([folder])
+
+    def pack_atlas(self, image_paths):
+        image_paths = [
+            image_path
+            for image_path in dict.fromkeys(map(path.normpath, image_paths))
+            if isinstance(self.images.get(image_path), pygame.Surface)
+            and self.images[image_path].get_parent() is None
+            # a caller already holds this surface, packing it would store it twice
+            and image_path not in self.handed_out
+        ]
+        if len(image_paths) < 2:
+            return
+        atlas = Atlas([self.images[image_path] for image_path in image_paths])
+        self.atlases.append(atlas)
+        for image_path, frame in zip(image_paths, atlas.frames):
+            del self.image_paths[self.images[image_path]]
+            self.images[image_path] = frame
+            self.image_paths[frame] = image_path
+
+    def load_image(self, image_path, transform=None):
+        image_path = path.normpath(image_path)
+        if image_path not in self.images:
+            self.preload([image_path])
+        surface = self.images[image_path]
+        if isinstance(surface, pygame.error):
+            raise surface
+        self.handed_out.add(image_path)
+        if transform:
+            return self.transform_image(surface, transform)
+        return surface
+
+    def transform_image(self, surface, transform):
+        image_path = self.image_paths.get(surface)
+        if image_path is None:
+            # only loaded images are shared, caching others would keep them alive
+            return self.apply_transform(surface, transform)
+        # keyed by the source file so every caller shares one transformed copy
+        key = (image_path, transform)
+        if key not in self.transformed:
+            self.transformed[key] = self.apply_transform(surface, transform)
+        return self.transformed[key]
+
+    def apply_transform(self, surface, transform):
+        # transforms drop the RLE encoding, so the result picks its format again
+        surface = TRANSFORMS[transform](surface)
+        return convert_for_blit(surface, classify_alpha(surface))
+
+    def transform_frames(self, name, frames, transform):
+        # animation dicts are shared per asset, so every enemy of a type
+        # gets the same transformed set
+        key = (name, transform)
+        if key not in self.transformed_frames:
+            self.transformed_frames[key] = {
+                status: [self.transform_image(frame, transform) for frame in values]
+                for status, values in frames.items()
+            }
+        return self.transformed_frames[key]
+
+    def get_pixel_buffers(self, surfaces):
+        buffers = {}
+        for surface in surfaces:
+            if isinstance(surface, pygame.Surface):
+                owner = get_pixel_owner(surface)
+                buffers[id(owner)] = owner
+        return buffers.values()
+
+    def get_memory_usage(self):
+        surfaces = list(self.images.values()) + list(self.transformed.values())
+        return sum(map(get_surface_size, self.get_pixel_buffers(surfaces)))
+
+    def get_memory_report(self):
+        image_buffers = self.get_pixel_buffers(self.images.values())
+        transformed_buffers = self.get_pixel_buffers(self.transformed.values())
+        lines = [
+            f"images: {len(self.images)} surfaces in {len(image_buffers)} buffers "
+            f"({len(self.atlases)} atlas sheets), "
+            f"{sum(map(get_surface_size, image_buffers)) / 1024:.0f} KB",
+            f"transformed: {len(self.transformed)} surfaces, "
+            f"{sum(map(get_surface_size, transformed_buffers)) / 1024:.0f} KB",
+            f"total: {self.get_memory_usage() / 1024:.0f} KB",
+        ]
+        return "\n".join(lines)
+
+    def get_format_report(self):
+        lines = [
+            f"{image_path}: {alpha_class}"
+            for image_path, alpha_class in sorted(self.alpha_classes.items())
+        ]
+        counts = {}
+        for alpha_class in self.alpha_classes.values():
+            counts[alpha_class] = counts.get(alpha_class, 0) + 1
+        lines.append(
+            "total: "
+            + ", ".join(f"{count} {name}" for name, count in sorted(counts.items()))
+        )
+        return "\n".join(lines)
+
+    def get_report(self):
+        lines = [
+            f"{directory}: {timing['files']} files, "
+            f"unpack {timing['unpack'] * 1000:.1f} ms, "
+            f"decode {timing['decode'] * 1000:.1f} ms, "
+            f"convert {timing['convert'] * 1000:.1f} ms"
+            for directory, timing in sorted(self.timings.items())
+        ]
+        total_unpack = sum(timing["unpack"] for timing in self.timings.values())
+        total_decode = sum(timing["decode"] for timing in self.timings.values())
+        total_convert = sum(timing["convert"] for timing in self.timings.values())
+        lines.append(
+            f"total: {len(self.images)} files, unpack {total_unpack * 1000:.1f} ms, "
+            f"decode {total_decode * 1000:.1f} ms "
+            f"on {self.workers} threads, convert {total_convert * 1000:.1f} ms"
+        )
+        return "\n".join(lines)
+
+
+# images are decoded once and shared by the game, the editor and the menu
+asset_loader = AssetLoader()
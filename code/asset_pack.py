@@ -0,0 +1,126 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from os import path
+
+import pygame
+from settings import ASSET_PACK_PATH
+from surface_format import classify_alpha
+
+PACK_MAGIC = b"SPMPACK2"
+PACK_HEADER = struct.Struct("<8sQ")
+
+
+def hash_file(file_path):
+    with open(file_path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def build_pack(folder=path.join("..", "graphics"), pack_path=ASSET_PACK_PATH):
+    manifest = {}
+    buffers = []
+    offset = 0
+    for dirpath, _, filenames in os.walk(path.normpath(folder)):
+        for filename in sorted(filenames):
+            file_path = path.join(dirpath, filename)
+            try:
+                surface = pygame.image.load(file_path)
+            except pygame.error:
+                continue
+            buffer = pygame.image.tobytes(surface, "RGBA")
+            stat = os.stat(file_path)
+            manifest[file_path] = {
+                "offset": offset,
+                "length": len(buffer),
+                "size": surface.get_size(),
+                "mtime": stat.st_mtime_ns,
+                "file_size": stat.st_size,
+                "hash": hash_file(file_path),
+                # classifying every image is most of the work of loading it
+                "alpha_class": classify_alpha(surface),
+            }
+            buffers.append(buffer)
+            offset += len(buffer)
+
+    manifest_bytes = json.dumps(manifest).encode()
+    os.makedirs(path.dirname(pack_path) or ".", exist_ok=True)
+    with open(pack_path, "wb") as file:
+        file.write(PACK_HEADER.pack(PACK_MAGIC, len(manifest_bytes)))
+        file.write(manifest_bytes)
+        for buffer in buffers:
+            file.write(buffer)
+    return len(manifest), offset
+
+
+class AssetPack:
+    def __init__(self, pack_path=ASSET_PACK_PATH):
+        self.file = open(pack_path, "rb")
+        self.data = None
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.read_manifest()
+        except (OSError, ValueError, KeyError, TypeError, struct.error) as error:
+            # a pack left half written by an interrupted build is just ignored
+            self.close()
+            raise ValueError(f"{pack_path} is not a valid asset pack") from error
+
+    def read_manifest(self):
+        magic, manifest_length = PACK_HEADER.unpack_from(self.data)
+        if magic != PACK_MAGIC:
+            raise ValueError("wrong magic bytes")
+        manifest_start = PACK_HEADER.size
+        self.data_start = manifest_start + manifest_length
+        self.manifest = json.loads(self.data[manifest_start : self.data_start])
+        data_length = len(self.data) - self.data_start
+        for entry in self.manifest.values():
+            if entry["offset"] + entry["length"] > data_length:
+                raise ValueError("pixel data is truncated")
+
+    def is_valid(self, file_path):
+        entry = self.manifest.get(file_path)
+        if entry is None:
+            return False
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        if stat.st_mtime_ns == entry["mtime"] and stat.st_size == entry["file_size"]:
+            return True
+        # a checkout can touch the file without changing it
+        return stat.st_size == entry["file_size"] and (
+            hash_file(file_path) == entry["hash"]
+        )
+
+    def get_valid_paths(self, file_paths):
+        valid_paths = [
+            file_path for file_path in file_paths if self.is_valid(file_path)
+        ]
+        # read the buffers in file order so the pack is read in one pass
+        return sorted(
+            valid_paths, key=lambda file_path: self.manifest[file_path]["offset"]
+        )
+
+    def get_surface(self, file_path):
+        entry = self.manifest[file_path]
+        start = self.data_start + entry["offset"]
+        buffer = self.data[start : start + entry["length"]]
+        return pygame.image.frombytes(buffer, entry["size"], "RGBA")
+
+    def get_alpha_class(self, file_path):
+        return self.manifest[file_path]["alpha_class"]
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+        self.file.close()
+
+
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else path.join("..", "graphics")
+    count, size = build_pack(folder)
+    print(
+        f"Packed {count} images ({size / 1024 / 1024:.1f} MB) into {ASSET_PACK_PATH}."
+    )
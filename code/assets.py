@@ -0,0 +1,241 @@
+from os import path
+
+from asset_loader import asset_loader
+from settings import (
+    BACKGROUND_TYPES,
+    COLLECTABLE_TYPES,
+    ENEMY_TYPES,
+    FOREGROUND_TYPES,
+    PARTICLE_TYPES,
+)
+from utils import (
+    cache_masks,
+    import_folder,
+    import_folder_as_dict,
+    import_subfolders_as_list,
+)
+
+
+class LazyAssets:
+    def __init__(self, entries):
+        # every entry is either a nested LazyAssets or (loader, path, masked)
+        self.entries = entries
+        self.assets = {}
+
+    def __getitem__(self, key):
+        if key not in self.assets:
+            entry = self.entries[key]
+            if isinstance(entry, LazyAssets):
+                self.assets[key] = entry
+            else:
+                loader, asset_path, masked = entry
+                asset = loader(asset_path)
+                if masked:
+                    cache_masks(asset)
+                self.assets[key] = asset
+        return self.assets[key]
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def keys(self):
+        return self.entries.keys()
+
+    def get_pending(self, keys):
+        entry = self.entries.get(keys[0]) if keys else None
+        if entry is None:
+            return []
+        if isinstance(entry, LazyAssets):
+            if len(keys) > 1:
+                return entry.get_pending(keys[1:])
+            return [
+                pending for key in entry.keys() for pending in entry.get_pending((key,))
+            ]
+        if keys[0] in self.assets:
+            return []
+        return [(self, keys[0])]
+
+    def prefetch(self, key_paths):
+        pending = []
+        for keys in key_paths:
+            for item in self.get_pending(keys):
+                if item not in pending:
+                    pending.append(item)
+        # decode everything the level needs in a single batch
+        asset_loader.preload_folders(
+            [assets.entries[key][1] for assets, key in pending]
+        )
+        for assets, key in pending:
+            assets[key]
+
+
+def create_assets():
+    graphics_path = path.join("..", "graphics")
+
+    coin = LazyAssets(
+        {
+            coin_type.replace(" ", "_"): (
+                import_subfolders_as_list,
+                path.join(graphics_path, "coin", coin_type.replace(" ", "_")),
+                True,
+            )
+            for coin_type in COLLECTABLE_TYPES["coin"].keys()
+        }
+    )
+    enemy = LazyAssets(
+        {
+            enemy_type.replace(" ", "_"): (
+                import_subfolders_as_list,
+                path.join(graphics_path, "enemy", enemy_type.replace(" ", "_")),
+                True,
+            )
+            for enemy_type in ENEMY_TYPES.keys()
+        }
+    )
+
+    foreground = {}
+    for main_type, values in FOREGROUND_TYPES.items():
+        foreground_type = main_type.replace(" ", "_")
+        foreground_path = path.join(graphics_path, foreground_type)
+        if values["types"]:
+            foreground[foreground_type] = LazyAssets(
+                {
+                    subtype: (
+                        import_subfolders_as_list,
+                        path.join(foreground_path, subtype),
+                        True,
+                    )
+                    for subtype in values["types"].keys()
+                }
+            )
+        else:
+            foreground[foreground_type] = (
+                import_subfolders_as_list,
+                foreground_path,
+                True,
+            )
+
+    background = {}
+    for main_type, subtypes in BACKGROUND_TYPES.items():
+        background_type = main_type.replace(" ", "_")
+        background_path = path.join(graphics_path, background_type)
+        if len(subtypes) > 0:
+            background[background_type] = LazyAssets(
+                {
+                    subtype: (
+                        import_subfolders_as_list,
+                        path.join(background_path, subtype),
+                        True,
+                    )
+                    for subtype in subtypes
+                }
+            )
+        else:
+            background[background_type] = (
+                import_subfolders_as_list,
+                background_path,
+                True,
+            )
+
+    particle = LazyAssets(
+        {
+            particle_type.replace(" ", "_"): (
+                import_subfolders_as_list,
+                path.join(graphics_path, "particle", particle_type.replace(" ", "_")),
+                True,
+            )
+            for particle_type in PARTICLE_TYPES
+        }
+    )
+
+    return LazyAssets(
+        {
+            "land": (
+                import_folder_as_dict,
+                path.join(graphics_path, "terrain", "land"),
+                False,
+            ),
+            "player": (
+                import_subfolders_as_list,
+                path.join(graphics_path, "player"),
+                True,
+            ),
+            "water_bottom": (
+                asset_loader.load_image,
+                path.join(graphics_path, "terrain", "water", "water_bottom.png"),
+                False,
+            ),
+            "water_top": (
+                import_subfolders_as_list,
+                path.join(graphics_path, "terrain", "water"),
+                True,
+            ),
+            "coin": coin,
+            "enemy": enemy,
+            "foreground": LazyAssets(foreground),
+            "background": LazyAssets(background),
+            "particle": particle,
+            "pearl": (
+                asset_loader.load_image,
+                path.join(graphics_path, "pearl", "pearl.png"),
+                True,
+            ),
+            "cloud": (
+                import_folder,
+                path.join(graphics_path, "cloud", "small"),
+                False,
+            ),
+        }
+    )
+
+
+def get_editor_folders():
+    graphics_path = path.join("..", "graphics")
+    folders = [
+        path.join(graphics_path, folder)
+        for folder in ("menu", "preview", "cursor", "terrain")
+    ]
+    folders.append(path.join(graphics_path, "cloud", "small"))
+    folders.append(path.join(graphics_path, "player", "idle_right"))
+    # the idle animation of every item the editor menu places
+    for coin_type in COLLECTABLE_TYPES["coin"].keys():
+        folders.append(
+            path.join(graphics_path, "coin", coin_type.replace(" ", "_"), "idle")
+        )
+    for enemy_type in ENEMY_TYPES.keys():
+        folders.append(path.join(graphics_path, "enemy", enemy_type, "idle"))
+    for main_type, values in FOREGROUND_TYPES.items():
+        for subtype in values["types"].keys():
+            folders.append(
+                path.join(graphics_path, main_type.replace(" ", "_"), subtype, "idle")
+            )
+    for main_type, subtypes in BACKGROUND_TYPES.items():
+        for subtype in subtypes:
+            folders.append(
+                path.join(graphics_path, main_type.replace(" ", "_"), subtype, "idle")
+            )
+    return folders
+
+
+def get_grid_asset_keys(grid):
+    keys = [("player",), ("cloud",)]
+    if grid.get("land"):
+        keys.append(("land",))
+    for water_type in grid.get("water", {}).values():
+        keys.append(("water_top",) if water_type == "top" else ("water_bottom",))
+    for coin_type in grid.get("coin", {}).values():
+        keys.append(("coin", coin_type))
+        keys.append(("particle", "coin"))
+    for enemy_type in grid.get("enemy", {}).values():
+        if enemy_type.startswith("shell"):
+            keys.append(("enemy", "shell"))
+            keys.append(("pearl",))
+        else:
+            keys.append(("enemy", enemy_type))
+    for layer in ("foreground", "background"):
+        for object_type, object_subtype in grid.get(layer, {}).values():
+            if object_subtype:
+                keys.append((layer, object_type, object_subtype))
+            else:
+                keys.append((layer, object_type))
+    return list(dict.fromkeys(keys))
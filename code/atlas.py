@@ -0,0 +1,53 @@
+import pygame
+from settings import ATLAS_MAX_WIDTH
+from surface_format import (
+    combine_alpha_classes,
+    copy_pixels,
+    create_surface,
+    enable_rle,
+    get_alpha_class,
+)
+
+
+def pack_rows(sizes, order, max_width):
+    # shelf packing: tallest frames first, each row filled left to right
+    rects = [None] * len(sizes)
+    x = y = row_height = width = 0
+    for index in order:
+        frame_width, frame_height = sizes[index]
+        if x and x + frame_width > max_width:
+            y += row_height
+            x = row_height = 0
+        rects[index] = pygame.Rect(x, y, frame_width, frame_height)
+        x += frame_width
+        row_height = max(row_height, frame_height)
+        width = max(width, x)
+    return rects, (width, y + row_height)
+
+
+def pack_rects(sizes, max_width=ATLAS_MAX_WIDTH):
+    order = sorted(range(len(sizes)), key=lambda index: -sizes[index][1])
+    # try every row width a prefix of the frames fits into and keep the smallest
+    widths = {max(width for width, _ in sizes)}
+    row_width = 0
+    for index in order:
+        row_width += sizes[index][0]
+        if row_width <= max_width:
+            widths.add(row_width)
+    packings = [pack_rows(sizes, order, width) for width in sorted(widths)]
+    return min(packings, key=lambda packing: packing[1][0] * packing[1][1])
+
+
+class Atlas:
+    def __init__(self, surfaces, max_width=ATLAS_MAX_WIDTH):
+        self.rects, size = pack_rects(
+            [surface.get_size() for surface in surfaces], max_width
+        )
+        self.alpha_class = combine_alpha_classes(map(get_alpha_class, surfaces))
+        self.sheet = create_surface(size, self.alpha_class)
+        copy_pixels(self.sheet, zip(surfaces, self.rects))
+        self.frames = [self.sheet.subsurface(rect) for rect in self.rects]
+        if self.alpha_class == "colorkey":
+            # the sheet keeps its raw pixels, each frame gets its own encoding
+            for frame in self.frames:
+                enable_rle(frame)
@@ -0,0 +1,128 @@
+from os import path
+
+import pygame
+from settings import MUSIC_FADE_DURATION
+
+
+class SilentSound:
+    def play(self, loops=0, maxtime=0, fade_ms=0):
+        return None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+    def get_volume(self):
+        return 0.0
+
+    def get_length(self):
+        return 0.0
+
+
+class AudioBank:
+    def __init__(self, folder=path.join("..", "audio")):
+        self.folder = folder
+        self.sounds = {}
+        self.request_counts = {}
+        self.sizes = {}
+        self.enabled = True
+        self.silent_sound = SilentSound()
+
+    @property
+    def active(self):
+        # without an audio device the mixer never initialises
+        return self.enabled and pygame.mixer.get_init() is not None
+
+    def get_sound(self, name, volume=None):
+        if not self.active:
+            return self.silent_sound
+        if name not in self.sounds:
+            sound = pygame.mixer.Sound(path.join(self.folder, name))
+            self.sounds[name] = sound
+            self.sizes[name] = self.get_sound_size(sound)
+        # every request after the first one is a load the cache saved
+        self.request_counts[name] = self.request_counts.get(name, 0) + 1
+        sound = self.sounds[name]
+        if volume is not None:
+            sound.set_volume(volume)
+        return sound
+
+    def get_sound_size(self, sound):
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        # the low byte of the sample format is the number of bits per sample
+        sample_size = (abs(sample_format) & 0xFF) // 8
+        return int(sound.get_length() * frequency) * channels * sample_size
+
+    def get_memory_usage(self):
+        return sum(self.sizes.values())
+
+    def get_stats(self):
+        return {
+            name: {"requests": self.request_counts[name], "bytes": self.sizes[name]}
+            for name in self.sounds
+        }
+
+
+class MusicPlayer:
+    def __init__(self, folder=path.join("..", "audio"), fade_ms=MUSIC_FADE_DURATION):
+        self.folder = folder
+        self.fade_ms = fade_ms
+        self.current_track = None
+        self.next_track = None
+        self.paused = False
+        self.enabled = True
+
+    @property
+    def active(self):
+        return self.enabled and pygame.mixer.get_init() is not None
+
+    def play(self, name, volume=1.0):
+        if not self.active:
+            return
+        if name == self.current_track and self.next_track is None:
+            if self.paused:
+                self.unpause()
+            if pygame.mixer.music.get_busy():
+                return
+        if pygame.mixer.music.get_busy():
+            # the track switch happens in update() once the fade out is over
+            pygame.mixer.music.fadeout(self.fade_ms)
+            self.next_track = (name, volume)
+        else:
+            self.start(name, volume)
+
+    def start(self, name, volume):
+        pygame.mixer.music.load(path.join(self.folder, name))
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(loops=-1, fade_ms=self.fade_ms)
+        self.current_track = name
+        self.next_track = None
+        self.paused = False
+
+    def pause(self):
+        if not self.active:
+            return
+        pygame.mixer.music.pause()
+        self.paused = True
+
+    def unpause(self):
+        if not self.active:
+            return
+        pygame.mixer.music.unpause()
+        self.paused = False
+
+    def update(self):
+        # paused music is not busy either, the next track waits for the unpause
+        if not self.active or self.paused:
+            return
+        if self.next_track and not pygame.mixer.music.get_busy():
+            self.start(*self.next_track)
+
+
+# every sound is decoded once and shared by all the sprites that play it
+audio_bank = AudioBank()
+
+# music is streamed from disk instead of being decoded into memory
+music_player = MusicPlayer()
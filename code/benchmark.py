@@ -0,0 +1,349 @@
+import argparse
+import contextlib
+import datetime
+import gc
+import json
+import os
+import random
+import tracemalloc
+from os import path
+from time import perf_counter
+
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None
+
+import pygame
+from asset_loader import asset_loader
+from assets import get_grid_asset_keys
+from headless import HeadlessRunner
+from player import set_key_source
+from recorder import KeyState
+from settings import (
+    COLLECTABLE_TYPES,
+    NEIGHBOR_DIRECTIONS,
+    PALM_TYPES,
+    SIMULATION_RATE,
+    TILE_SIZE,
+)
+from surface_format import ALPHA_CLASSES
+
+DEFAULT_DENSITIES = {
+    "water": 0.1,
+    "coin": 0.2,
+    "tooth": 0.03,
+    "shell": 0.02,
+    "palm": 0.05,
+}
+GROUND_DEPTH = 10
+
+
+def create_floor(width, floor_y):
+    land = {}
+    for col in range(width):
+        # land tiles are named after their neighbors: C is right, G is left
+        land_type = ("C" if col < width - 1 else "") + ("G" if col > 0 else "")
+        land[(col * TILE_SIZE, floor_y)] = land_type or "X"
+    return land
+
+
+def create_enemy_grid(enemy_count, enemy_type="tooth"):
+    floor_y = TILE_SIZE * 10
+    return {
+        "player": {(TILE_SIZE * 2, floor_y - TILE_SIZE): "idle_right"},
+        "sky_handle": {(0, floor_y - TILE_SIZE * 4): "sky_handle"},
+        "water": {},
+        "land": create_floor(enemy_count + 10, floor_y),
+        "coin": {},
+        "enemy": {
+            ((col + 5) * TILE_SIZE, floor_y - TILE_SIZE): enemy_type
+            for col in range(enemy_count)
+        },
+        "foreground": {},
+        "background": {},
+    }
+
+
+def name_land_tiles(cells, land_tile_types):
+    # same naming as the editor: the directions of every neighboring land tile
+    land = {}
+    for col, row in cells:
+        land_type = "".join(
+            name
+            for name, offset in NEIGHBOR_DIRECTIONS.items()
+            if (col + offset[0], row + offset[1]) in cells
+        )
+        land[(col * TILE_SIZE, row * TILE_SIZE)] = (
+            land_type if land_type in land_tile_types else "X"
+        )
+    return land
+
+
+def create_synthetic_grid(land_tile_count, land_tile_types, densities, seed=0):
+    rng = random.Random(seed)
+    width = max(land_tile_count // GROUND_DEPTH, 8)
+    grid = {
+        "player": {},
+        "sky_handle": {},
+        "water": {},
+        "land": {},
+        "coin": {},
+        "enemy": {},
+        "foreground": {},
+        "background": {},
+    }
+
+    # a ground line that wanders up and down, GROUND_DEPTH tiles deep
+    surface_rows = []
+    row = GROUND_DEPTH
+    for col in range(width):
+        row = min(max(row + rng.choice((-1, 0, 0, 1)), 6), 14)
+        surface_rows.append(row)
+    # the spawn area is flat, a hitbox wider than a tile would start in a slope
+    surface_rows[:5] = [surface_rows[4]] * 5
+    cells = {
+        (col, surface_row + depth)
+        for col, surface_row in enumerate(surface_rows)
+        for depth in range(GROUND_DEPTH)
+    }
+    grid["land"] = name_land_tiles(cells, land_tile_types)
+
+    coin_types = list(COLLECTABLE_TYPES["coin"].keys())
+    for col, surface_row in enumerate(surface_rows):
+        x = col * TILE_SIZE
+        y = surface_row * TILE_SIZE
+        # the first columns stay clear so the player does not spawn into an enemy
+        if col >= 5 and rng.random() < densities["water"]:
+            grid["water"][(x, y - TILE_SIZE * 2)] = "top"
+            grid["water"][(x, y - TILE_SIZE)] = "bottom"
+            continue
+        if rng.random() < densities["coin"]:
+            grid["coin"][(x + TILE_SIZE // 2, y - TILE_SIZE * 2 + TILE_SIZE // 2)] = (
+                rng.choice(coin_types)
+            )
+        if col >= 5 and rng.random() < densities["tooth"]:
+            grid["enemy"][(x, y - TILE_SIZE)] = "tooth"
+        elif col >= 5 and rng.random() < densities["shell"]:
+            grid["enemy"][(x, y - TILE_SIZE)] = rng.choice(
+                ("shell_left", "shell_right")
+            )
+        if rng.random() < densities["palm"]:
+            layer = rng.choice(("foreground", "background"))
+            palm_type = "palm_fg" if layer == "foreground" else "palm_bg"
+            grid[layer][(x, y - TILE_SIZE * 2)] = (palm_type, rng.choice(PALM_TYPES))
+
+    # a coin at the far end keeps the level from being won during the run
+    last_col = width - 1
+    grid["coin"][
+        (
+            last_col * TILE_SIZE + TILE_SIZE // 2,
+            (surface_rows[last_col] - 2) * TILE_SIZE + TILE_SIZE // 2,
+        )
+    ] = coin_types[0]
+    grid["player"][(TILE_SIZE * 2, (surface_rows[2] - 1) * TILE_SIZE)] = "idle_right"
+    grid["sky_handle"][(0, TILE_SIZE * 4)] = "sky_handle"
+    return grid
+
+
+def get_peak_rss_kb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def get_percentile(values, percentile):
+    values = sorted(values)
+    return values[min(int(len(values) * percentile / 100), len(values) - 1)]
+
+
+class Benchmark:
+    def __init__(self):
+        self.runner = HeadlessRunner(render=True)
+        self.assets = self.runner.assets
+
+    def create_level(self, grid):
+        return self.runner.load_level(grid)
+
+    def measure_build(self, grid):
+        # load the images first so only the level itself is measured
+        self.assets.prefetch(get_grid_asset_keys(grid))
+        gc.collect()
+        start = perf_counter()
+        level = self.create_level(grid)
+        build_time = perf_counter() - start
+        del level
+
+        gc.collect()
+        surface_memory = asset_loader.get_memory_usage()
+        tracemalloc.start()
+        level = self.create_level(grid)
+        python_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return {
+            "build_ms": build_time * 1000,
+            "python_kb": python_memory / 1024,
+            "surface_kb": (asset_loader.get_memory_usage() - surface_memory) / 1024,
+            "sprites": len(level.all_sprites),
+        }
+
+    def run_build(self, enemy_counts, enemy_type):
+        print("enemies  build ms  python KB  new surface KB  sprites")
+        for enemy_count in enemy_counts:
+            result = self.measure_build(create_enemy_grid(enemy_count, enemy_type))
+            print(
+                f"{enemy_count:7d}  {result['build_ms']:8.1f}  "
+                f"{result['python_kb']:9.0f}  {result['surface_kb']:14.0f}  "
+                f"{result['sprites']:7d}"
+            )
+
+    def measure_frames(self, level, frames):
+        # run right and jump every second so the camera and the enemies keep moving
+        keys = KeyState([pygame.K_RIGHT])
+        set_key_source(lambda: keys)
+        level.player.health = float("inf")
+        frame_times = []
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for frame in range(frames):
+                if frame % SIMULATION_RATE < 10:
+                    keys.pressed.add(pygame.K_SPACE)
+                else:
+                    keys.pressed.discard(pygame.K_SPACE)
+                start = perf_counter()
+                self.runner.step(1 / SIMULATION_RATE)
+                frame_times.append(perf_counter() - start)
+        set_key_source(pygame.key.get_pressed)
+        return frame_times
+
+    def run_runtime(self, sizes, densities, frames, seed, output):
+        results = []
+        print("land tiles  sprites  build ms  mean ms  p99 ms  python KB  peak RSS KB")
+        for size in sizes:
+            grid = create_synthetic_grid(size, self.assets["land"], densities, seed)
+            result = self.measure_build(grid)
+            frame_times = self.measure_frames(self.runner.level, frames)
+            result.update(
+                {
+                    "land_tiles": len(grid["land"]),
+                    "frames": frames,
+                    "mean_ms": sum(frame_times) / len(frame_times) * 1000,
+                    "p99_ms": get_percentile(frame_times, 99) * 1000,
+                    "peak_rss_kb": get_peak_rss_kb(),
+                }
+            )
+            results.append(result)
+            print(
+                f"{result['land_tiles']:10d}  {result['sprites']:7d}  "
+                f"{result['build_ms']:8.1f}  {result['mean_ms']:7.2f}  "
+                f"{result['p99_ms']:6.2f}  {result['python_kb']:9.0f}  "
+                f"{result['peak_rss_kb'] or 0:11d}"
+            )
+
+        if output is None:
+            date = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            output = path.join("..", "benchmarks", f"runtime_{date}.json")
+        os.makedirs(path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w") as file:
+            json.dump(
+                {
+                    "seed": seed,
+                    "densities": densities,
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+        print(f"Results written to {output}.")
+
+    def measure_blits(self, surfaces, repeats):
+        screen = pygame.display.get_surface()
+        blit_sequence = [(surface, (0, 0)) for surface in surfaces] * repeats
+        start = perf_counter()
+        screen.blits(blit_sequence, doreturn=False)
+        return (perf_counter() - start) / len(blit_sequence)
+
+    def run_blit(self, repeats, show_formats):
+        asset_loader.preload_folder(path.join("..", "graphics"))
+        if show_formats:
+            print(asset_loader.get_format_report())
+        print("format    assets  convert_alpha us  chosen us  speedup")
+        for alpha_class in ALPHA_CLASSES:
+            image_paths = [
+                image_path
+                for image_path, image_class in asset_loader.alpha_classes.items()
+                if image_class == alpha_class
+            ]
+            if not image_paths:
+                continue
+            # the reference is what every image used to be converted to
+            reference = [
+                pygame.image.load(image_path).convert_alpha()
+                for image_path in image_paths
+            ]
+            chosen = [asset_loader.load_image(image_path) for image_path in image_paths]
+            reference_time = self.measure_blits(reference, repeats)
+            chosen_time = self.measure_blits(chosen, repeats)
+            print(
+                f"{alpha_class:8s}  {len(image_paths):6d}  "
+                f"{reference_time * 1e6:16.2f}  {chosen_time * 1e6:9.2f}  "
+                f"{reference_time / chosen_time:6.1f}x"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Super Pirate Maker benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser(
+        "build", help="time Level.build_level against the number of enemies"
+    )
+    build_parser.add_argument(
+        "--enemies", type=int, nargs="+", default=[1, 10, 50, 100, 200]
+    )
+    build_parser.add_argument(
+        "--enemy-type", choices=["tooth", "shell_left", "spikes"], default="tooth"
+    )
+
+    blit_parser = commands.add_parser(
+        "blit", help="compare blit times of the chosen surface formats"
+    )
+    blit_parser.add_argument("--repeats", type=int, default=200)
+    blit_parser.add_argument(
+        "--formats", action="store_true", help="list the format chosen per asset"
+    )
+
+    runtime_parser = commands.add_parser(
+        "runtime", help="build synthetic levels and time their frames"
+    )
+    runtime_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    for name, density in DEFAULT_DENSITIES.items():
+        runtime_parser.add_argument(
+            f"--{name}",
+            type=float,
+            default=density,
+            help=f"share of ground columns with a {name} (default {density})",
+        )
+    runtime_parser.add_argument("--frames", type=int, default=600)
+    runtime_parser.add_argument("--seed", type=int, default=0)
+    runtime_parser.add_argument(
+        "--output", help="JSON file, defaults to ../benchmarks/runtime_<date>.json"
+    )
+
+    args = parser.parse_args()
+    benchmark = Benchmark()
+    if args.command == "build":
+        benchmark.run_build(args.enemies, args.enemy_type)
+    elif args.command == "blit":
+        benchmark.run_blit(args.repeats, args.formats)
+    elif args.command == "runtime":
+        densities = {name: getattr(args, name) for name in DEFAULT_DENSITIES}
+        benchmark.run_runtime(
+            args.sizes, densities, args.frames, args.seed, args.output
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,84 @@
 import pygame
-from settings import HORIZON_COLOR, HORIZON_TOP_COLOR, SEA_COLOR, SORTING_LAYERS
+from settings import (
+    CULLING_CELL_SIZE,
+    CULLING_MARGIN,
+    HORIZON_COLOR,
+    HORIZON_TOP_COLOR,
+    SEA_COLOR,
+    SORTING_LAYERS,
+)
+from spatial_hash import SpatialHash
 
 
 class CameraGroup(pygame.sprite.Group):
+    counter_sources = {
+        "drawn": lambda group: group.drawn_count,
+        "culled": lambda group: group.culled_count,
+        "terrain_bakes": lambda group: sum(
+            terrain.bake_count
+            for terrains in group.terrain_layers.values()
+            for terrain in terrains
+        ),
+    }
+
     def __init__(self):
         super().__init__()
         self.display_surface = pygame.display.get_surface()
         self.offset = pygame.Vector2()
 
+        # sprites are bucketed by sorting layer as they join the group
+        self.static_layers = {
+            layer: SpatialHash(CULLING_CELL_SIZE) for layer in SORTING_LAYERS
+        }
+        self.dynamic_layers = {layer: {} for layer in SORTING_LAYERS}
+        self.terrain_layers = {layer: [] for layer in SORTING_LAYERS}
+        self.pending_sprites = []
+        self.draw_order = {}
+        self.next_draw_order = 0
+        self.drawn_count = 0
+        self.culled_count = 0
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.draw_order[sprite] = self.next_draw_order
+        self.next_draw_order += 1
+        if sprite.static:
+            # sprites join the group before their rect is set, so index them later
+            self.pending_sprites.append(sprite)
+        else:
+            self.dynamic_layers[sprite.sorting_layer][sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        del self.draw_order[sprite]
+        self.static_layers[sprite.sorting_layer].remove(sprite)
+        self.dynamic_layers[sprite.sorting_layer].pop(sprite, None)
+
+    def add_terrain(self, terrain):
+        self.terrain_layers[terrain.sorting_layer].append(terrain)
+
+    def index_pending_sprites(self):
+        for sprite in self.pending_sprites:
+            if sprite in self.draw_order:
+                self.static_layers[sprite.sorting_layer].add(sprite, sprite.rect)
+        self.pending_sprites.clear()
+
+    def get_visible_sprites(self, layer, camera_rect):
+        search_rect = camera_rect.inflate(CULLING_MARGIN * 2, CULLING_MARGIN * 2)
+        visible_rect = camera_rect.inflate(2, 2)
+        visible_sprites = [
+            sprite
+            for sprite in self.static_layers[layer].query(search_rect)
+            if sprite.rect.colliderect(visible_rect)
+        ]
+        visible_sprites.extend(
+            sprite
+            for sprite in self.dynamic_layers[layer]
+            if sprite.rect.colliderect(visible_rect)
+        )
+        visible_sprites.sort(key=self.draw_order.get)
+        return visible_sprites
+
     def draw_horizon(self, horizon_y):
         window_width = self.display_surface.get_width()
         window_height = self.display_surface.get_height()
@@ -38,14 +109,32 @@ class CameraGroup(pygame.sprite.Group):
     def custom_draw(self, player, horizon_y):
         window_width = self.display_surface.get_width()
         window_height = self.display_surface.get_height()
-        self.offset.x = player.rect.centerx - window_width / 2
-        self.offset.y = player.rect.centery - window_height / 2
+        # whole pixels, so the horizon, terrain, sprites and hitboxes all agree
+        offset_x = player.rect.centerx - window_width // 2
+        offset_y = player.rect.centery - window_height // 2
+        self.offset.update(offset_x, offset_y)
 
         self.draw_horizon(horizon_y)
 
+        camera_rect = pygame.Rect(self.offset, (window_width, window_height))
+        self.index_pending_sprites()
+        self.drawn_count = 0
         for layer in SORTING_LAYERS:
-            for sprite in self.sprites():
-                if sprite.sorting_layer == layer:
-                    offset_rect = sprite.rect.copy()
-                    offset_rect.center -= self.offset
-                    self.display_surface.blit(sprite.image, offset_rect)
+            for terrain in self.terrain_layers[layer]:
+                self.display_surface.blits(
+                    [
+                        (surface, (x - offset_x, y - offset_y))
+                        for surface, (x, y) in terrain.get_visible_chunks(camera_rect)
+                    ],
+                    doreturn=False,
+                )
+            visible_sprites = self.get_visible_sprites(layer, camera_rect)
+            self.display_surface.blits(
+                [
+                    (sprite.image, (sprite.rect.x - offset_x, sprite.rect.y - offset_y))
+                    for sprite in visible_sprites
+                ],
+                doreturn=False,
+            )
+            self.drawn_count += len(visible_sprites)
+        self.culled_count = len(self.draw_order) - self.drawn_count
@@ -0,0 +1,101 @@
+from array import array
+
+import pygame
+from settings import TILE_SIZE
+
+
+class TileMap:
+    def __init__(self, positions, tile_size=TILE_SIZE):
+        self.tile_size = tile_size
+        cells = [
+            (int(x) // self.tile_size, int(y) // self.tile_size) for x, y in positions
+        ]
+        if cells:
+            self.min_col = min(col for col, _ in cells)
+            self.min_row = min(row for _, row in cells)
+            self.cols = max(col for col, _ in cells) - self.min_col + 1
+            self.rows = max(row for _, row in cells) - self.min_row + 1
+        else:
+            self.min_col = self.min_row = self.cols = self.rows = 0
+        self.solid = bytearray(self.cols * self.rows)
+        for col, row in cells:
+            self.solid[(row - self.min_row) * self.cols + col - self.min_col] = 1
+        self.tile_count = len(cells)
+        self.rects = []
+        self.cell_rects = array("i", [-1]) * (self.cols * self.rows)
+        self.merge_tiles()
+
+    def merge_tiles(self):
+        # greedy meshing: grow each run of solid tiles to the right, then down
+        for row in range(self.rows):
+            for col in range(self.cols):
+                index = row * self.cols + col
+                if not self.solid[index] or self.cell_rects[index] != -1:
+                    continue
+                width = 1
+                while (
+                    col + width < self.cols
+                    and self.solid[index + width]
+                    and self.cell_rects[index + width] == -1
+                ):
+                    width += 1
+                height = 1
+                while row + height < self.rows and all(
+                    self.solid[(row + height) * self.cols + col + offset]
+                    and self.cell_rects[(row + height) * self.cols + col + offset] == -1
+                    for offset in range(width)
+                ):
+                    height += 1
+                rect_id = len(self.rects)
+                for merged_row in range(row, row + height):
+                    start = merged_row * self.cols + col
+                    self.cell_rects[start : start + width] = array(
+                        "i", [rect_id] * width
+                    )
+                self.rects.append(
+                    pygame.Rect(
+                        (col + self.min_col) * self.tile_size,
+                        (row + self.min_row) * self.tile_size,
+                        width * self.tile_size,
+                        height * self.tile_size,
+                    )
+                )
+
+    def get_stats(self):
+        rect_count = len(self.rects)
+        return {
+            "tiles": self.tile_count,
+            "rects": rect_count,
+            "reduction": self.tile_count / rect_count if rect_count else 1.0,
+        }
+
+    def get_rects(self, rect):
+        left = max(rect.left // self.tile_size - self.min_col, 0)
+        right = min((rect.right - 1) // self.tile_size - self.min_col, self.cols - 1)
+        top = max(rect.top // self.tile_size - self.min_row, 0)
+        bottom = min((rect.bottom - 1) // self.tile_size - self.min_row, self.rows - 1)
+        rect_ids = []
+        for row in range(top, bottom + 1):
+            for col in range(left, right + 1):
+                rect_id = self.cell_rects[row * self.cols + col]
+                if rect_id != -1 and rect_id not in rect_ids:
+                    rect_ids.append(rect_id)
+        return [self.rects[rect_id] for rect_id in rect_ids]
+
+
+class CollisionWorld:
+    def __init__(self, tile_map, dynamic_colliders):
+        self.tile_map = tile_map
+        self.dynamic_colliders = dynamic_colliders
+
+    def get_hitboxes(self, rect):
+        # static terrain first, matching the order sprites used to be added in
+        hitboxes = self.tile_map.get_rects(rect)
+        for sprite in self.dynamic_colliders.query(rect):
+            hitboxes.append(sprite.hitbox)
+        return hitboxes
+
+    def draw_hitboxes(self, surface, offset):
+        area = pygame.Rect(offset, surface.get_size())
+        for hitbox in self.get_hitboxes(area):
+            pygame.draw.rect(surface, "red", hitbox.move(-offset.x, -offset.y), 2)
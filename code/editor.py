@@ -6,9 +6,12 @@ from random import choice, randint
 
 import pygame
 import pygame_gui
+from asset_loader import asset_loader
 from canvas_object import CanvasObject, PlayerObject, SkyHandle
 from canvas_tile import CanvasTile
+from frame_stats import frame_stats
 from menu import Menu
+from profiler import counters
 from settings import (
     ANIMATION_SPEED,
     HORIZON_COLOR,
@@ -37,6 +40,7 @@ class Editor:
         window_height = self.display_surface.get_height()
         self.ui_manager = ui_manager
         self.switch_mode = switch_mode
+        self.level_file = None
 
         # menu setup
         self.menu = Menu()
@@ -45,9 +49,9 @@ class Editor:
         # assets setup
         self.canvas_data = {}
         self.land_tile_types = land_tile_types
-        self.water_bottom = pygame.image.load(
+        self.water_bottom = asset_loader.load_image(
             path.join("..", "graphics", "terrain", "water", "water_bottom.png")
-        ).convert_alpha()
+        )
         self.animations = {}
         self.import_animations()
         self.frame_index = 0
@@ -81,6 +85,9 @@ class Editor:
         self.background_objects = pygame.sprite.Group()
         self.object_drag_active = False
         self.object_timer = Timer(400)
+        counters.register("editor.canvas_tiles", lambda: len(self.canvas_data))
+        counters.register("editor.canvas_objects", lambda: len(self.canvas_objects))
+        counters.register("editor.clouds", lambda: len(self.current_clouds))
 
         # player
         player_path = path.join("..", "graphics", "player", "idle_right")
@@ -94,7 +101,7 @@ class Editor:
 
         # sky
         sky_handle_path = path.join("..", "graphics", "cursor", "handle.png")
-        self.sky_handle_surf = pygame.image.load(sky_handle_path).convert_alpha()
+        self.sky_handle_surf = asset_loader.load_image(sky_handle_path)
         self.sky_handle = SkyHandle(
             (window_width / 2, window_height / 2),
             [self.sky_handle_surf],
@@ -164,8 +171,8 @@ class Editor:
                 self.animations[index] = import_folder(menu_item_folder)
                 if orientation == "right":
                     for key, value in enumerate(self.animations[index]):
-                        self.animations[index][key] = pygame.transform.flip(
-                            value, True, False
+                        self.animations[index][key] = asset_loader.transform_image(
+                            value, "flip"
                         )
 
     def import_preview_surfaces(self):
@@ -175,7 +182,7 @@ class Editor:
             menu_item_path = path.join(
                 "..", "graphics", "preview", menu_section, f"{menu_item}.png"
             )
-            menu_item_surface = pygame.image.load(menu_item_path).convert_alpha()
+            menu_item_surface = asset_loader.load_image(menu_item_path)
             self.preview_surfaces[index] = (menu_section, menu_item_surface)
 
     def create_grid(self):
@@ -276,6 +283,7 @@ class Editor:
         file_name = path.join(save_path, f"level_{current_date_time}.txt")
         with open(file_name, "x") as file:
             file.write(str(grid))
+        self.level_file = file_name
         self.export_success(f"level_{current_date_time}.txt")
 
     def import_grid(self, file_name):
@@ -472,6 +480,8 @@ class Editor:
                     self.canvas_objects = original_objects
                     self.background_objects = original_background_objects
                     self.foreground_objects = original_foreground_objects
+                else:
+                    self.level_file = file_name
 
     def toggle_pan(self):
         self.pan_active = not self.pan_active
@@ -822,7 +832,7 @@ class Editor:
         window_height = self.display_surface.get_height()
         surface = choice(self.cloud_surfaces)
         if randint(0, 4) < 2:
-            surface = pygame.transform.scale2x(surface)
+            surface = asset_loader.transform_image(surface, "scale2x")
         if position == "center":
             x_position = randint(0, window_width)
         elif position == "right":
@@ -889,16 +899,30 @@ class Editor:
 
     def update(self, dt):
         self.frame_index += ANIMATION_SPEED * dt
-        self.canvas_objects.update(dt)
+        with frame_stats.span("canvas_objects"):
+            self.canvas_objects.update(dt)
+        frame_stats.count("objects_updated", len(self.canvas_objects))
         self.update_clouds(dt)
         self.update_timers()
         self.display_surface.fill("gray")
-        self.draw_background()
-        self.draw_level()
-        self.draw_tile_lines()
+        with frame_stats.span("background"):
+            self.draw_background()
+        with frame_stats.span("draw_level"):
+            self.draw_level()
+        frame_stats.count("tiles_drawn", len(self.canvas_data))
+        frame_stats.count(
+            "objects_drawn",
+            len(self.background_objects) + len(self.foreground_objects),
+        )
+        with frame_stats.span("tile_lines"):
+            self.draw_tile_lines()
         pygame.draw.circle(self.display_surface, "red", self.origin, 10)
         self.draw_world_limits()
-        self.preview()
-        self.hover()
-        self.menu.display(self.selected_index)
-        self.ui_manager.display()
+        with frame_stats.span("preview"):
+            self.preview()
+        with frame_stats.span("hover"):
+            self.hover()
+        with frame_stats.span("menu"):
+            self.menu.display(self.selected_index)
+        with frame_stats.span("ui_display"):
+            self.ui_manager.display()
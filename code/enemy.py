@@ -1,4 +1,5 @@
 import pygame
+from asset_loader import asset_loader
 from settings import COLLISION_OFFSET
 from sprites import Animated
 from timer import Timer
@@ -24,6 +25,8 @@ class Enemy(Animated):
 
 
 class Spikes(Enemy):
+    static = True
+
     def __init__(
         self,
         position,
@@ -40,17 +43,17 @@ class Tooth(Enemy):
         groups,
         animations,
         orientation="left",
-        collision_sprites=[],
+        collision_world=None,
     ):
         super().__init__("tooth", position, groups, animations, damage=20)
-        self.left_frames = animations.copy()
-        self.right_frames = self.flip_frames(animations)
+        self.left_frames = animations
+        self.right_frames = asset_loader.transform_frames("tooth", animations, "flip")
         self.orientation = orientation
         self.set_orientation(orientation)
         self.direction = (
             pygame.Vector2(1, 0) if orientation == "right" else pygame.Vector2(-1, 0)
         )
-        self.collision_sprites = collision_sprites
+        self.collision_world = collision_world
         self.speed = 120
         self.idle_timer = Timer(2000)
         self.idle_timer.activate()
@@ -58,12 +61,6 @@ class Tooth(Enemy):
     def update_status(self):
         self.status = "idle" if self.idle_timer.active else "run"
 
-    def flip_frames(self, frames):
-        return {
-            key: [pygame.transform.flip(value, True, False) for value in values]
-            for key, values in frames.copy().items()
-        }
-
     def update_orientation(self):
         if self.direction.x == 1:
             self.set_orientation("right")
@@ -77,28 +74,28 @@ class Tooth(Enemy):
         else:
             self.frames = self.left_frames
 
+    def get_nearby_hitboxes(self, probe_rect):
+        area = probe_rect.inflate(COLLISION_OFFSET * 2, COLLISION_OFFSET * 2)
+        return self.collision_world.get_hitboxes(area)
+
     def sprite_left_collide(self):
         left_rect = pygame.Rect(
             self.hitbox.topleft, (COLLISION_OFFSET, self.hitbox.height)
         )
-        for sprite in self.collision_sprites:
-            sprite_rect = pygame.Rect(
-                sprite.hitbox.topright, (COLLISION_OFFSET, sprite.hitbox.height)
-            )
-            if sprite_rect.colliderect(left_rect):
-                return sprite
+        for hitbox in self.get_nearby_hitboxes(left_rect):
+            edge_rect = pygame.Rect(hitbox.topright, (COLLISION_OFFSET, hitbox.height))
+            if edge_rect.colliderect(left_rect):
+                return hitbox
         return None
 
     def sprite_right_collide(self):
         right_rect = pygame.Rect(
             self.hitbox.topright, (COLLISION_OFFSET, self.hitbox.height)
         )
-        for sprite in self.collision_sprites:
-            sprite_rect = pygame.Rect(
-                sprite.hitbox.topleft, (COLLISION_OFFSET, sprite.hitbox.height)
-            )
-            if sprite_rect.colliderect(right_rect):
-                return sprite
+        for hitbox in self.get_nearby_hitboxes(right_rect):
+            edge_rect = pygame.Rect(hitbox.topleft, (COLLISION_OFFSET, hitbox.height))
+            if edge_rect.colliderect(right_rect):
+                return hitbox
         return None
 
     def sprite_down_collide(self):
@@ -107,9 +104,9 @@ class Tooth(Enemy):
             if self.direction.x == -1
             else self.hitbox.bottomright
         )
-        for sprite in self.collision_sprites:
-            if sprite.hitbox.collidepoint(point):
-                return sprite
+        for hitbox in self.collision_world.get_hitboxes(pygame.Rect(point, (1, 1))):
+            if hitbox.collidepoint(point):
+                return hitbox
         return None
 
     def horizontal_collide(self):
@@ -150,6 +147,8 @@ class Tooth(Enemy):
 
 
 class Shell(Enemy):
+    static = True
+
     def __init__(
         self,
         position,
@@ -161,8 +160,8 @@ class Shell(Enemy):
         orientation="left",
     ):
         super().__init__("shell", position, groups, animations, damage=0)
-        self.left_frames = animations.copy()
-        self.right_frames = self.flip_frames(animations)
+        self.left_frames = animations
+        self.right_frames = asset_loader.transform_frames("shell", animations, "flip")
         self.orientation = orientation
         self.set_orientation(orientation)
         self.projectile_image = projectile_image
@@ -170,12 +169,6 @@ class Shell(Enemy):
         self.player = player
         self.attack_cooldown = Timer(2000)
 
-    def flip_frames(self, frames):
-        return {
-            key: [pygame.transform.flip(value, True, False) for value in values]
-            for key, values in frames.copy().items()
-        }
-
     def set_orientation(self, orientation):
         self.orientation = orientation
         self.frames = self.left_frames if orientation == "left" else self.right_frames
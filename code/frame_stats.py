@@ -0,0 +1,143 @@
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+
+import pygame
+from settings import (
+    FPS,
+    FRAME_GRAPH_BAR_WIDTH,
+    FRAME_GRAPH_COLORS,
+    FRAME_GRAPH_HEIGHT,
+    FRAME_GRAPH_OTHER_COLOR,
+    FRAME_GRAPH_SCALE,
+    FRAME_STATS_HISTORY,
+)
+
+
+class FrameStats:
+    def __init__(self, history=FRAME_STATS_HISTORY):
+        self.history = deque(maxlen=history)
+        self.phases = {}
+        self.counts = {}
+        self.frame_start = perf_counter()
+
+    def begin_frame(self):
+        self.phases = {}
+        self.counts = {}
+        self.frame_start = perf_counter()
+
+    @contextmanager
+    def span(self, name):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            # a phase can run more than once a frame, e.g. one simulation step each
+            self.phases[name] = self.phases.get(name, 0) + perf_counter() - start
+
+    def count(self, name, value):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def end_frame(self, dt):
+        frame = {
+            "dt": dt,
+            "time": perf_counter() - self.frame_start,
+            "phases": self.phases,
+            "counts": self.counts,
+        }
+        self.history.append(frame)
+        return frame
+
+    def get_averages(self):
+        phases = {}
+        counts = {}
+        for frame in self.history:
+            for name, seconds in frame["phases"].items():
+                phases[name] = phases.get(name, 0) + seconds
+            for name, value in frame["counts"].items():
+                counts[name] = counts.get(name, 0) + value
+        frame_count = max(len(self.history), 1)
+        return (
+            {name: seconds / frame_count for name, seconds in phases.items()},
+            {name: value / frame_count for name, value in counts.items()},
+        )
+
+
+class FrameGraph:
+    def __init__(self, stats):
+        self.stats = stats
+        self.visible = False
+        self.font = pygame.font.Font(None, 20)
+        self.phase_colors = {}
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def get_phase_color(self, name):
+        if name not in self.phase_colors:
+            self.phase_colors[name] = FRAME_GRAPH_COLORS[
+                len(self.phase_colors) % len(FRAME_GRAPH_COLORS)
+            ]
+        return self.phase_colors[name]
+
+    def draw_bars(self, surface, rect):
+        for index, frame in enumerate(self.stats.history):
+            x = rect.left + index * FRAME_GRAPH_BAR_WIDTH
+            y = rect.bottom
+            # whatever no span covered is stacked on top in gray
+            other = frame["time"] - sum(frame["phases"].values())
+            bars = [
+                (self.get_phase_color(name), seconds)
+                for name, seconds in frame["phases"].items()
+            ]
+            bars.append((FRAME_GRAPH_OTHER_COLOR, other))
+            for color, seconds in bars:
+                height = min(seconds * 1000 * FRAME_GRAPH_SCALE, y - rect.top)
+                if height >= 1:
+                    y -= height
+                    pygame.draw.rect(
+                        surface, color, (x, y, FRAME_GRAPH_BAR_WIDTH, height)
+                    )
+
+        budget_y = rect.bottom - 1000 / FPS * FRAME_GRAPH_SCALE
+        if budget_y > rect.top:
+            pygame.draw.line(
+                surface, "white", (rect.left, budget_y), (rect.right, budget_y)
+            )
+
+    def render_legend(self):
+        phases, counts = self.stats.get_averages()
+        frame_count = max(len(self.stats.history), 1)
+        frame_time = sum(frame["time"] for frame in self.stats.history) / frame_count
+        lines = [("white", f"frame {frame_time * 1000:.2f} ms")]
+        lines.extend(
+            (self.get_phase_color(name), f"{name} {seconds * 1000:.2f} ms")
+            for name, seconds in phases.items()
+        )
+        lines.extend(("white", f"{name} {value:.0f}") for name, value in counts.items())
+        return [self.font.render(text, True, color) for color, text in lines]
+
+    def draw(self, surface):
+        if not self.visible:
+            return
+        rect = pygame.Rect(
+            10,
+            10,
+            self.stats.history.maxlen * FRAME_GRAPH_BAR_WIDTH,
+            FRAME_GRAPH_HEIGHT,
+        )
+        legend = self.render_legend()
+        legend_height = sum(text.get_height() for text in legend)
+        background = pygame.Surface(
+            (rect.width + 10, rect.height + legend_height + 15), pygame.SRCALPHA
+        )
+        background.fill((0, 0, 0, 160))
+        surface.blit(background, (rect.left - 5, rect.top - 5))
+        self.draw_bars(surface, rect)
+        y = rect.bottom + 5
+        for text in legend:
+            surface.blit(text, (rect.left, y))
+            y += text.get_height()
+
+
+frame_stats = FrameStats()
@@ -0,0 +1,121 @@
+import argparse
+import ast
+import os
+from time import perf_counter
+
+# the dummy drivers have to be picked before pygame opens a window or the mixer
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import pygame
+from asset_loader import asset_loader
+from assets import create_assets
+from audio import audio_bank, music_player
+from level import Level
+from settings import ASSET_PACK_PATH, SIMULATION_RATE
+from timer import SimulatedClock, set_time_source
+
+
+class NullUIManager:
+    def __init__(self):
+        self.opened_dialog = None
+        self.dialogs = []
+
+    def process_event(self, event):
+        pass
+
+    def update(self, dt):
+        pass
+
+    def display(self):
+        pass
+
+    def show_confirmation_dialog(
+        self,
+        title="Confirmation",
+        message="",
+        button_text="Confirm",
+        object_id="confirmation_dialog",
+        blocking=True,
+    ):
+        # nobody can answer, so only remember which dialog the level asked for
+        self.dialogs.append(object_id)
+
+
+class HeadlessLevel(Level):
+    def draw(self, alpha):
+        pass
+
+
+def load_grid(file_name):
+    with open(file_name, "r") as file:
+        return ast.literal_eval(file.read())
+
+
+class HeadlessRunner:
+    def __init__(self, window_size=(1280, 720), render=False):
+        pygame.init()
+        pygame.display.set_mode(window_size)
+        asset_loader.open_pack(ASSET_PACK_PATH)
+        # nothing is heard, so sounds are neither decoded nor played
+        audio_bank.enabled = False
+        music_player.enabled = False
+        self.clock = SimulatedClock()
+        set_time_source(self.clock.get_ticks)
+        self.assets = create_assets()
+        self.ui_manager = NullUIManager()
+        self.render = render
+        self.grid = None
+        self.level = None
+
+    def load_level(self, grid, seed=None):
+        self.grid = grid
+        level_class = Level if self.render else HeadlessLevel
+        self.level = level_class(
+            self.ui_manager,
+            grid,
+            self.assets,
+            lambda grid=None: None,
+            self.load_level,
+            seed=seed,
+        )
+        return self.level
+
+    def step(self, dt=1 / SIMULATION_RATE):
+        self.clock.advance(dt)
+        self.level.update(dt)
+
+    def run(self, frames, dt=1 / SIMULATION_RATE):
+        for frame in range(frames):
+            # the level pauses itself when the player wins or dies
+            if self.level.paused:
+                return frame
+            self.step(dt)
+        return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a level without a window")
+    parser.add_argument("level", help="level file exported by the editor")
+    parser.add_argument("--frames", type=int, default=3600)
+    parser.add_argument("--render", action="store_true", help="draw every frame")
+    args = parser.parse_args()
+
+    runner = HeadlessRunner(render=args.render)
+    runner.load_level(load_grid(args.level))
+    start = perf_counter()
+    frames = runner.run(args.frames)
+    elapsed = perf_counter() - start
+    player = runner.level.player
+    print(
+        f"Simulated {frames} frames in {elapsed:.2f} s "
+        f"({frames / elapsed:.0f} frames/s)."
+    )
+    print(
+        f"Player at {player.hitbox.topleft} with {player.health} health, "
+        f"dialogs: {runner.ui_manager.dialogs}."
+    )
+
+
+if __name__ == "__main__":
+    main()
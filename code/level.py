@@ -1,23 +1,56 @@
+import random
 import sys
-from os import path
-from random import choice, randint
 
 import pygame
 import pygame_gui
+from animation_clock import AnimationClocks
+from asset_loader import asset_loader
+from assets import get_grid_asset_keys
+from audio import music_player
 from camera_group import CameraGroup
+from collision import CollisionWorld, TileMap
 from enemy import Enemy, Shell, Spikes, Tooth
+from frame_stats import frame_stats
 from player import Player
 from settings import (
+    ACTIVITY_CHECK_INTERVAL,
+    ACTIVITY_RADIUS,
+    CLOUD_INTERVAL,
     COLLECTABLE_TYPES,
     FOREGROUND_TYPES,
     INITIAL_CLOUDS_LEVEL,
+    MAX_SIMULATION_STEPS,
+    SIMULATION_RATE,
     SKY_COLOR,
 )
-from sprites import AnimatedObject, Cloud, Coin, Generic, Mask, Particle, Water
+from spatial_hash import SpatialHash
+from sprites import AnimatedObject, Cloud, Coin, Mask, Particle, Water
+from terrain import TerrainChunks
+from timer import Timer
 
 
 class Level:
-    def __init__(self, ui_manager, grid, assets, switch_mode, reset_level, debug=False):
+    # the game registers these for whichever level is current
+    counter_sources = {
+        "simulation_steps": lambda level: level.simulation_steps,
+        "all_sprites": lambda level: len(level.all_sprites),
+        "animated_sprites": lambda level: len(level.animated_sprites),
+        "sleeping_sprites": lambda level: len(level.sleeping_sprites),
+        "collision_sprites": lambda level: len(level.collision_sprites),
+        "damage_sprites": lambda level: len(level.damage_sprites),
+        "clouds": lambda level: len(level.cloud_sprites),
+    }
+
+    def __init__(
+        self,
+        ui_manager,
+        grid,
+        assets,
+        switch_mode,
+        reset_level,
+        debug=False,
+        seed=None,
+    ):
         # main setup
         self.display_surface = pygame.display.get_surface()
         self.ui_manager = ui_manager
@@ -26,28 +59,41 @@ class Level:
         self.paused = False
         self.debug = debug
         self.reset_level = reset_level
+        # clouds get their own generator, so a seed replays them exactly
+        self.seed = random.randrange(2**32) if seed is None else seed
+        self.random = random.Random(self.seed)
 
         # assets setup
         self.assets = assets
+        self.assets.prefetch(get_grid_asset_keys(self.grid))
         self.all_sprites = CameraGroup()
         self.animated_sprites = pygame.sprite.Group()
+        self.sleeping_sprites = pygame.sprite.Group()
+        self.animation_clocks = AnimationClocks()
         self.collectable_sprites = pygame.sprite.Group()
         self.enemy_sprites = pygame.sprite.Group()
         self.collision_sprites = pygame.sprite.Group()
         self.damage_sprites = pygame.sprite.Group()
+        self.cloud_sprites = pygame.sprite.Group()
+        self.collision_hash = SpatialHash()
+        self.tile_map = TileMap(self.grid.get("land", {}).keys())
+        self.collision_world = CollisionWorld(self.tile_map, self.collision_hash)
         self.player = None
+        self.simulation_step = 1 / SIMULATION_RATE
+        self.simulation_time = 0
+        self.simulation_steps = 0
+        self.previous_positions = {}
         self.horizon_y = self.display_surface.get_height() // 2
         self.build_level()
         self.right_edge = sorted(
             list(self.grid["land"].keys()), key=lambda pos: pos[0]
         )[-1][0]
-        self.cloud_timer = pygame.event.custom_type()
-        pygame.time.set_timer(self.cloud_timer, 2000)
+        self.cloud_timer = Timer(CLOUD_INTERVAL, self.spawn_cloud)
+        self.cloud_timer.activate()
         self.create_initial_clouds()
-        level_sound_path = path.join("..", "audio", "level.ogg")
-        self.level_sound = pygame.mixer.Sound(level_sound_path)
-        self.level_sound.set_volume(0.4)
-        self.level_sound.play(loops=-1)
+        self.activity_timer = Timer(ACTIVITY_CHECK_INTERVAL, self.update_activity_zone)
+        self.update_activity_zone()
+        music_player.play("level.ogg", 0.4)
 
     def build_level(self):
         # player
@@ -56,7 +102,7 @@ class Level:
             position,
             self.assets["player"],
             [self.all_sprites, self.animated_sprites],
-            self.collision_sprites,
+            self.collision_world,
             status,
         )
 
@@ -65,27 +111,34 @@ class Level:
 
         # land
         if "land" in self.grid:
-            for position, land_tile_type in self.grid["land"].items():
-                surface = self.assets["land"][land_tile_type]
-                Generic(position, surface, [self.all_sprites, self.collision_sprites])
+            land_tiles = {
+                position: self.assets["land"][land_tile_type]
+                for position, land_tile_type in self.grid["land"].items()
+            }
+            self.all_sprites.add_terrain(TerrainChunks(land_tiles, "main"))
+            if self.debug:
+                stats = self.tile_map.get_stats()
+                print(
+                    f"Merged {stats['tiles']} land tiles into {stats['rects']} "
+                    f"collision rects ({stats['reduction']:.1f}x reduction)."
+                )
 
         # water
         if "water" in self.grid:
+            water_bottom_tiles = {}
             for position, water_type in self.grid["water"].items():
                 if water_type == "top":
                     Water(
                         water_type,
                         position,
-                        self.assets["water_top"],
-                        [self.all_sprites, self.animated_sprites],
-                    )
-                elif water_type == "bottom":
-                    Generic(
-                        position,
-                        self.assets["water_bottom"],
+                        self.animation_clocks.get_clock(
+                            self.assets["water_top"]["idle"]
+                        ),
                         [self.all_sprites],
-                        sorting_layer="water",
                     )
+                elif water_type == "bottom":
+                    water_bottom_tiles[position] = self.assets["water_bottom"]
+            self.all_sprites.add_terrain(TerrainChunks(water_bottom_tiles, "water"))
 
         # coins
         if "coin" in self.grid:
@@ -93,8 +146,10 @@ class Level:
                 Coin(
                     coin_type,
                     position,
-                    self.assets["coin"][coin_type],
-                    [self.all_sprites, self.animated_sprites, self.collectable_sprites],
+                    self.animation_clocks.get_clock(
+                        self.assets["coin"][coin_type]["idle"]
+                    ),
+                    [self.all_sprites, self.collectable_sprites],
                 )
 
         # enemies
@@ -121,7 +176,7 @@ class Level:
                             self.damage_sprites,
                         ],
                         self.assets["enemy"][enemy_type],
-                        collision_sprites=self.collision_sprites,
+                        collision_world=self.collision_world,
                     )
                 elif enemy_type == "shell_left":
                     Shell(
@@ -179,12 +234,14 @@ class Level:
                     foreground_object_type,
                     foreground_object_subtype,
                     position,
-                    self.assets["foreground"][foreground_object_type][
-                        foreground_object_subtype
-                    ]
-                    if foreground_object_subtype
-                    else self.assets["foreground"][foreground_object_type],
-                    [self.all_sprites, self.animated_sprites],
+                    self.animation_clocks.get_clock(
+                        self.assets["foreground"][foreground_object_type][
+                            foreground_object_subtype
+                        ]["idle"]
+                        if foreground_object_subtype
+                        else self.assets["foreground"][foreground_object_type]["idle"]
+                    ),
+                    [self.all_sprites],
                 )
                 object_type = foreground_object_type.replace("_", " ")
                 object_subtype = foreground_object_subtype.replace("_", " ")
@@ -217,16 +274,25 @@ class Level:
                     background_object_type,
                     background_object_subtype,
                     position,
-                    self.assets["background"][background_object_type][
-                        background_object_subtype
-                    ]
-                    if background_object_subtype
-                    else self.assets["background"][background_object_type],
-                    [self.all_sprites, self.animated_sprites],
+                    self.animation_clocks.get_clock(
+                        self.assets["background"][background_object_type][
+                            background_object_subtype
+                        ]["idle"]
+                        if background_object_subtype
+                        else self.assets["background"][background_object_type]["idle"]
+                    ),
+                    [self.all_sprites],
                     background=True,
                     sorting_layer="background",
                 )
 
+        # dynamic colliders
+        for sprite in self.collision_sprites:
+            self.collision_hash.add(sprite)
+
+        if self.debug:
+            print(asset_loader.get_memory_report())
+
     def process_event(self, event):
         # gui events
         if event.type == pygame_gui.UI_CONFIRMATION_DIALOG_CONFIRMED:
@@ -254,17 +320,13 @@ class Level:
         if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
             self.toggle_pause()
 
-        # create a cloud
-        if event.type == self.cloud_timer:
-            self.create_cloud()
-
     def toggle_pause(self):
         if self.paused:
             self.paused = False
-            self.level_sound.play(loops=-1)
+            music_player.unpause()
         else:
             self.paused = True
-            self.level_sound.stop()
+            music_player.pause()
 
     def confirm_exit(self):
         self.ui_manager.show_confirmation_dialog(
@@ -331,40 +393,116 @@ class Level:
     def create_cloud(self, offscreen=True):
         left_limit = -self.display_surface.get_width()
         right_limit = self.right_edge + 500
-        surface = choice(self.assets["cloud"])
-        if randint(0, 5) > 3:
-            surface = pygame.transform.scale2x(surface)
+        surface = self.random.choice(self.assets["cloud"])
+        if self.random.randint(0, 5) > 3:
+            surface = asset_loader.transform_image(surface, "scale2x")
         x = (
-            right_limit + randint(100, 300)
+            right_limit + self.random.randint(100, 300)
             if offscreen
-            else randint(left_limit, right_limit)
+            else self.random.randint(left_limit, right_limit)
         )
-        y = self.horizon_y - randint(100, 600)
+        y = self.horizon_y - self.random.randint(100, 600)
         Cloud(
             (x, y),
             surface,
-            [self.all_sprites, self.animated_sprites],
+            [self.all_sprites, self.animated_sprites, self.cloud_sprites],
             left_limit,
-            randint(75, 125),
+            self.random.randint(75, 125),
         )
 
+    def spawn_cloud(self):
+        self.create_cloud()
+        self.cloud_timer.activate()
+
     def create_initial_clouds(self):
         for _ in range(INITIAL_CLOUDS_LEVEL):
             self.create_cloud(offscreen=False)
 
-    def update(self, dt):
-        self.display_surface.fill(SKY_COLOR)
-        if not self.paused:
+    def update_activity_zone(self):
+        activity_rect = pygame.Rect(0, 0, ACTIVITY_RADIUS * 2, ACTIVITY_RADIUS * 2)
+        activity_rect.center = self.player.hitbox.center
+
+        # put sprites far from the player to sleep
+        for sprite in self.animated_sprites.sprites():
+            if sprite.can_sleep and not activity_rect.colliderect(sprite.rect):
+                sprite.sleep()
+                self.animated_sprites.remove(sprite)
+                self.sleeping_sprites.add(sprite)
+
+        # wake up sprites that are close again
+        for sprite in self.sleeping_sprites.sprites():
+            if activity_rect.colliderect(sprite.rect):
+                sprite.wake()
+                self.sleeping_sprites.remove(sprite)
+                self.animated_sprites.add(sprite)
+
+        self.activity_timer.activate()
+
+    def simulate(self, dt):
+        self.previous_positions = {
+            sprite: sprite.rect.center for sprite in self.animated_sprites
+        }
+        with frame_stats.span("collectables"):
             self.get_collectables()
+        with frame_stats.span("damage"):
             self.check_damage()
+        self.activity_timer.update()
+        self.cloud_timer.update()
+        with frame_stats.span("animated_sprites"):
             self.animated_sprites.update(dt)
-        self.all_sprites.custom_draw(self.player, self.horizon_y)
+        frame_stats.count("sprites_updated", len(self.animated_sprites))
+        self.animation_clocks.update(dt)
+
+    def interpolate_positions(self, alpha):
+        # draw moving sprites between their last two simulated positions
+        simulated_rects = {}
+        for sprite, (previous_x, previous_y) in self.previous_positions.items():
+            rect = sprite.rect
+            if rect.center != (previous_x, previous_y):
+                simulated_rects[sprite] = rect
+                sprite.rect = rect.copy()
+                sprite.rect.center = (
+                    round(previous_x + (rect.centerx - previous_x) * alpha),
+                    round(previous_y + (rect.centery - previous_y) * alpha),
+                )
+        return simulated_rects
+
+    def update(self, dt):
+        self.simulation_steps = 0
+        if self.paused:
+            self.simulation_time = 0
+        else:
+            self.simulation_time += dt
+            while (
+                self.simulation_time >= self.simulation_step
+                and self.simulation_steps < MAX_SIMULATION_STEPS
+                and not self.paused
+            ):
+                self.simulate(self.simulation_step)
+                self.simulation_time -= self.simulation_step
+                self.simulation_steps += 1
+            # after a long stall the game slows down instead of catching up
+            self.simulation_time %= self.simulation_step
+        self.draw(self.simulation_time / self.simulation_step)
+
+    def draw(self, alpha):
+        self.display_surface.fill(SKY_COLOR)
+        simulated_rects = self.interpolate_positions(alpha)
+        with frame_stats.span("custom_draw"):
+            self.all_sprites.custom_draw(self.player, self.horizon_y)
+        frame_stats.count("sprites_drawn", self.all_sprites.drawn_count)
+        for sprite, rect in simulated_rects.items():
+            sprite.rect = rect
         if self.debug:
-            for sprite in self.collision_sprites:
-                sprite.draw_hitbox(self.display_surface, self.player)
+            with frame_stats.span("hitboxes"):
+                self.collision_world.draw_hitboxes(
+                    self.display_surface, self.all_sprites.offset
+                )
         if self.paused:
-            dark_surface = pygame.Surface(self.display_surface.get_size())
-            dark_surface.set_alpha(128)
-            dark_surface.fill((0, 0, 0))
-            self.display_surface.blit(dark_surface, (0, 0))
-        self.ui_manager.display()
+            with frame_stats.span("pause_overlay"):
+                dark_surface = pygame.Surface(self.display_surface.get_size())
+                dark_surface.set_alpha(128)
+                dark_surface.fill((0, 0, 0))
+                self.display_surface.blit(dark_surface, (0, 0))
+        with frame_stats.span("ui_display"):
+            self.ui_manager.display()
@@ -1,145 +1,139 @@
+import argparse
+import atexit
 from os import path
+from time import perf_counter
 
 import pygame
+from asset_loader import asset_loader
+from assets import create_assets, get_editor_folders
+from audio import audio_bank, music_player
+from camera_group import CameraGroup
 from editor import Editor
+from frame_stats import FrameGraph, frame_stats
 from level import Level
-from settings import (
-    BACKGROUND_TYPES,
-    COLLECTABLE_TYPES,
-    ENEMY_TYPES,
-    FOREGROUND_TYPES,
-    FPS,
-    PARTICLE_TYPES,
-)
+from metrics import MetricsWriter
+from player import set_key_source
+from profiler import Profiler, counters
+from recorder import InputRecorder
+from settings import ASSET_PACK_PATH, FPS, PROFILE_FRAMES
+from timer import SimulatedClock, set_time_source
 from transition import Transition
 from ui_manager import UIManager
-from utils import import_folder, import_folder_as_dict, import_subfolders_as_list
 
 
 class Game:
-    def __init__(self):
+    def __init__(
+        self,
+        record=False,
+        profile=False,
+        profile_frames=PROFILE_FRAMES,
+        metrics_file=None,
+        metrics_interval=0,
+        startup_report=False,
+    ):
+        self.startup_start = perf_counter() if startup_report else None
         pygame.init()
         self.screen = pygame.display.set_mode((0, 0), pygame.RESIZABLE)
         pygame.display.set_caption("Super Pirate Maker")
         self.clock = pygame.time.Clock()
-        self.assets = {}
-        self.import_assets()
+        # timers advance once per frame, so a recorded session replays exactly
+        self.game_clock = SimulatedClock()
+        set_time_source(self.game_clock.get_ticks)
+        self.recorder = None
+        if record:
+            self.recorder = InputRecorder()
+            set_key_source(self.recorder.get_keys)
+            atexit.register(self.recorder.stop)
+        asset_loader.open_pack(ASSET_PACK_PATH)
+        # the editor needs its images right away, so they are decoded in one batch
+        asset_loader.preload_folders(get_editor_folders())
+        # level categories are loaded the first time a level uses them
+        self.assets = create_assets()
         self.editor_active = True
         self.transition = Transition(self.toggle_editor)
         self.ui_manager = UIManager()
         self.editor = Editor(self.ui_manager, self.assets["land"], self.switch_mode)
         self.level = None
         mouse_path = path.join("..", "graphics", "cursor", "mouse.png")
-        mouse_surface = pygame.image.load(mouse_path).convert_alpha()
+        mouse_surface = asset_loader.load_image(mouse_path)
         self.mouse_cursor = pygame.cursors.Cursor((0, 0), mouse_surface)
         self.debug = False
-        editor_music_path = path.join("..", "audio", "editor.ogg")
-        self.editor_music = pygame.mixer.Sound(editor_music_path)
-        self.editor_music.set_volume(0.4)
-        self.editor_music.play(loops=-1)
-
-    def import_assets(self):
-        # land
-        land_path = path.join("..", "graphics", "terrain", "land")
-        self.assets["land"] = import_folder_as_dict(land_path)
-
-        # player
-        player_path = path.join("..", "graphics", "player")
-        self.assets["player"] = import_subfolders_as_list(player_path)
-
-        # water
-        water_bottom_path = path.join(
-            "..", "graphics", "terrain", "water", "water_bottom.png"
+        self.frame_graph = FrameGraph(frame_stats)
+        # with --profile every level session starts with a capture
+        self.profile_levels = profile
+        self.profile_frames = profile_frames
+        self.profiler = Profiler(counters)
+        # requests above the loaded sounds are decodes the bank saved
+        counters.register("audio.loaded_sounds", lambda: len(audio_bank.sounds))
+        counters.register(
+            "audio.sound_requests", lambda: sum(audio_bank.request_counts.values())
         )
-        self.assets["water_bottom"] = pygame.image.load(
-            water_bottom_path
-        ).convert_alpha()
-        water_top_path = path.join("..", "graphics", "terrain", "water")
-        self.assets["water_top"] = import_subfolders_as_list(water_top_path)
-
-        # coin
-        self.assets["coin"] = {}
-        for value in COLLECTABLE_TYPES["coin"].keys():
-            coin_type = value.replace(" ", "_")
-            coin_path = path.join("..", "graphics", "coin", coin_type)
-            self.assets["coin"][coin_type] = import_subfolders_as_list(coin_path)
-
-        # enemy
-        self.assets["enemy"] = {}
-        for value in ENEMY_TYPES.keys():
-            enemy_type = value.replace(" ", "_")
-            enemy_path = path.join("..", "graphics", "enemy", enemy_type)
-            self.assets["enemy"][enemy_type] = import_subfolders_as_list(enemy_path)
-
-        # foreground
-        self.assets["foreground"] = {}
-        for main_type, values in FOREGROUND_TYPES.items():
-            foreground_type = main_type.replace(" ", "_")
-            foreground_path = path.join("..", "graphics", foreground_type)
-            if values["types"]:
-                self.assets["foreground"][foreground_type] = {}
-                subtypes = values["types"].keys()
-                for subtype in subtypes:
-                    subtype_path = path.join(foreground_path, subtype)
-                    self.assets["foreground"][foreground_type][subtype] = (
-                        import_subfolders_as_list(subtype_path)
-                    )
-            else:
-                self.assets["foreground"][foreground_type] = import_subfolders_as_list(
-                    foreground_path
-                )
-
-        # background
-        self.assets["background"] = {}
-        for main_type, subtypes in BACKGROUND_TYPES.items():
-            background_type = main_type.replace(" ", "_")
-            background_path = path.join("..", "graphics", background_type)
-            if len(subtypes) > 0:
-                self.assets["background"][background_type] = {}
-                for subtype in subtypes:
-                    subtype_path = path.join(background_path, subtype)
-                    self.assets["background"][background_type][subtype] = (
-                        import_subfolders_as_list(subtype_path)
-                    )
-            else:
-                self.assets["background"][background_type] = import_subfolders_as_list(
-                    background_path
-                )
-
-        # particles
-        self.assets["particle"] = {}
-        for value in PARTICLE_TYPES:
-            particle_type = value.replace(" ", "_")
-            particle_path = path.join("..", "graphics", "particle", particle_type)
-            self.assets["particle"][particle_type] = import_subfolders_as_list(
-                particle_path
-            )
-
-        # pearl
-        pearl_path = path.join("..", "graphics", "pearl", "pearl.png")
-        self.assets["pearl"] = pygame.image.load(pearl_path).convert_alpha()
-
-        # clouds
-        clouds_path = path.join("..", "graphics", "cloud", "small")
-        self.assets["cloud"] = import_folder(clouds_path)
+        counters.register(
+            "audio.memory_kb", lambda: audio_bank.get_memory_usage() // 1024
+        )
+        atexit.register(self.profiler.stop)
+        if profile:
+            atexit.register(self.print_audio_stats)
+        self.metrics = None
+        if metrics_file is not None:
+            # an empty name picks the default file in the metrics folder
+            self.metrics = MetricsWriter(metrics_file or None, metrics_interval)
+            atexit.register(self.metrics.close)
+        music_player.play("editor.ogg", 0.4)
 
     def toggle_editor(self):
         self.editor_active = not self.editor_active
+        if not self.editor_active:
+            self.start_level_profile()
 
     def switch_mode(self, grid=None):
         self.transition.active = True
         if grid:
-            self.editor_music.stop()
-            self.level = Level(
-                self.ui_manager,
-                grid,
-                self.assets,
-                self.switch_mode,
-                self.reset_level,
-                self.debug,
-            )
+            self.reset_level(grid)
         else:
-            self.editor_music.play(loops=-1)
+            if self.recorder:
+                self.recorder.stop()
+            # the editor frames should not report the counters of the old level
+            counters.unregister("level")
+            counters.unregister("camera")
+            music_player.play("editor.ogg", 0.4)
+
+    def get_level_name(self):
+        if self.editor.level_file:
+            return path.splitext(path.basename(self.editor.level_file))[0]
+        return "unsaved"
+
+    def start_level_profile(self):
+        if self.profile_levels:
+            self.profiler.start("level", self.get_level_name(), self.profile_frames)
+
+    def toggle_profiler(self):
+        mode = "editor" if self.editor_active else "level"
+        self.profiler.toggle(mode, self.get_level_name(), self.profile_frames)
+
+    def print_audio_stats(self):
+        for name, stats in sorted(audio_bank.get_stats().items()):
+            print(
+                f"{name}: loaded once for {stats['requests']} requests, "
+                f"{stats['bytes'] // 1024} KB"
+            )
+        print(f"Sounds take {audio_bank.get_memory_usage() // 1024} KB in total.")
+
+    def print_startup_report(self):
+        print(asset_loader.get_report())
+        startup_time = perf_counter() - self.startup_start
+        print(f"First editor frame after {startup_time * 1000:.0f} ms.")
+        self.startup_start = None
+
+    def register_level_counters(self):
+        # the level is looked up on every read, so a restarted level neither
+        # keeps the old one alive nor reports its values
+        for name, source in Level.counter_sources.items():
+            counters.register(f"level.{name}", lambda source=source: source(self.level))
+        for name, source in CameraGroup.counter_sources.items():
+            counters.register(
+                f"camera.{name}", lambda source=source: source(self.level.all_sprites)
+            )
 
     def reset_level(self, grid):
         self.level = Level(
@@ -150,33 +144,107 @@ class Game:
             self.reset_level,
             self.debug,
         )
+        self.register_level_counters()
+        if self.recorder:
+            self.recorder.start(self.level, self.game_clock.get_ticks())
+        # a level started from the editor is profiled once the transition is done
+        if not self.editor_active:
+            self.start_level_profile()
 
     def run(self):
         while True:
             dt = self.clock.tick(FPS) / 1000
-            for event in pygame.event.get():
-                self.ui_manager.process_event(event)
-                if self.editor_active:
-                    self.editor.process_event(event)
-                else:
-                    self.level.process_event(event)
+            self.game_clock.advance(dt)
+            frame_stats.begin_frame()
+            with frame_stats.span("events"):
+                for event in pygame.event.get():
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                        self.frame_graph.toggle()
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                        self.toggle_profiler()
+                    self.ui_manager.process_event(event)
+                    if self.editor_active:
+                        self.editor.process_event(event)
+                    else:
+                        self.level.process_event(event)
             if self.editor_active:
                 pygame.mouse.set_cursor(self.mouse_cursor)
                 pygame.mouse.set_visible(True)
-                self.ui_manager.update(dt)
+                with frame_stats.span("ui_update"):
+                    self.ui_manager.update(dt)
                 self.editor.update(dt)
             else:
                 pygame.mouse.set_visible(False)
-                self.ui_manager.update(dt)
+                with frame_stats.span("ui_update"):
+                    self.ui_manager.update(dt)
                 if self.ui_manager.opened_dialog:
                     pygame.mouse.set_cursor(self.mouse_cursor)
                     pygame.mouse.set_visible(True)
+                if self.recorder:
+                    self.recorder.record_frame(dt, self.game_clock.get_ticks())
                 self.level.update(dt)
+                if self.recorder:
+                    self.recorder.record_result()
             if self.transition.active:
-                self.transition.update(dt)
-            pygame.display.update()
+                with frame_stats.span("transition"):
+                    self.transition.update(dt)
+            music_player.update()
+            with frame_stats.span("frame_graph"):
+                self.frame_graph.draw(self.screen)
+            with frame_stats.span("display_update"):
+                pygame.display.update()
+            if self.startup_start is not None:
+                self.print_startup_report()
+            frame = frame_stats.end_frame(dt)
+            if self.metrics:
+                mode = "editor" if self.editor_active else "level"
+                self.metrics.add_frame(mode, frame, counters.read())
+            self.profiler.update()
 
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Super Pirate Maker")
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="save the input of every level session to the replays folder",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile the first frames of every level session with cProfile",
+    )
+    parser.add_argument(
+        "--profile-frames",
+        type=int,
+        default=PROFILE_FRAMES,
+        help=f"frames per profile, also for F4 (default {PROFILE_FRAMES})",
+    )
+    parser.add_argument(
+        "--metrics",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help="write frame metrics as JSON lines, by default to the metrics folder",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=0,
+        help="seconds averaged into one metrics record (default: one per frame)",
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print the image load times and the time to the first editor frame",
+    )
+    args = parser.parse_args()
+    game = Game(
+        args.record,
+        args.profile,
+        args.profile_frames,
+        args.metrics,
+        args.metrics_interval,
+        args.startup_report,
+    )
     game.run()
@@ -1,6 +1,7 @@
 from os import path
 
 import pygame
+from asset_loader import asset_loader
 from button import Button
 from settings import (
     BUTTON_LINE_COLOR,
@@ -63,11 +64,11 @@ class Menu:
             )
             if menu_section in self.menu_surfaces:
                 self.menu_surfaces[menu_section].append(
-                    (index, pygame.image.load(menu_surface_path).convert_alpha())
+                    (index, asset_loader.load_image(menu_surface_path))
                 )
             else:
                 self.menu_surfaces[menu_section] = [
-                    (index, pygame.image.load(menu_surface_path).convert_alpha())
+                    (index, asset_loader.load_image(menu_surface_path))
                 ]
 
     def create_buttons(self):
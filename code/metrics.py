@@ -0,0 +1,109 @@
+import datetime
+import json
+import os
+import queue
+import threading
+from os import path
+from time import perf_counter
+
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None
+
+from settings import METRICS_FLUSH_INTERVAL
+
+
+def get_memory_kb():
+    memory = {"rss_kb": None, "peak_rss_kb": None}
+    try:
+        with open("/proc/self/statm", "r") as file:
+            pages = int(file.read().split()[1])
+        memory["rss_kb"] = pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        # ru_maxrss is in kilobytes on linux
+        memory["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return memory
+
+
+def get_mean(values):
+    totals = {}
+    for value in values:
+        for name, number in value.items():
+            totals[name] = totals.get(name, 0) + number
+    return {name: total / len(values) for name, total in totals.items()}
+
+
+class MetricsWriter:
+    def __init__(self, file_name=None, interval=0):
+        if file_name is None:
+            date = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            file_name = path.join("..", "metrics", f"metrics_{date}.jsonl")
+        os.makedirs(path.dirname(file_name) or ".", exist_ok=True)
+        self.file_name = file_name
+        self.interval = interval
+        self.frame_index = 0
+        # the main loop only queues what it already has, the thread does the rest
+        self.records = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.write_records, daemon=True)
+        self.thread.start()
+
+    def add_frame(self, mode, frame, counter_values):
+        self.records.put((self.frame_index, mode, frame, counter_values))
+        self.frame_index += 1
+
+    def create_record(self, frames):
+        first_frame, mode = frames[0][:2]
+        stats = [frame for _, _, frame, _ in frames]
+        frame_times = [frame["time"] for frame in stats]
+        phases = get_mean([frame["phases"] for frame in stats])
+        record = {
+            "frame": first_frame,
+            "mode": mode,
+            "frames": len(frames),
+            "dt": sum(frame["dt"] for frame in stats) / len(stats),
+            "frame_ms": sum(frame_times) / len(frame_times) * 1000,
+            "frame_ms_max": max(frame_times) * 1000,
+            "phases_ms": {name: seconds * 1000 for name, seconds in phases.items()},
+            "counts": get_mean([frame["counts"] for frame in stats]),
+            "counters": get_mean([counter_values for *_, counter_values in frames]),
+            "memory": get_memory_kb(),
+        }
+        return json.dumps(record)
+
+    def write_records(self):
+        frames = []
+        window = 0
+        last_flush = perf_counter()
+        with open(self.file_name, "w") as file:
+            while True:
+                try:
+                    item = self.records.get(timeout=METRICS_FLUSH_INTERVAL)
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    break
+                if item:
+                    # a window never mixes editor and level frames
+                    if frames and frames[-1][1] != item[1]:
+                        file.write(self.create_record(frames) + "\n")
+                        frames = []
+                        window = 0
+                    frames.append(item)
+                    window += item[2]["dt"]
+                    if window >= self.interval:
+                        file.write(self.create_record(frames) + "\n")
+                        frames = []
+                        window = 0
+                if perf_counter() - last_flush >= METRICS_FLUSH_INTERVAL:
+                    file.flush()
+                    last_flush = perf_counter()
+            if frames:
+                file.write(self.create_record(frames) + "\n")
+
+    def close(self):
+        if self.thread.is_alive():
+            self.records.put(None)
+            self.thread.join()
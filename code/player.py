@@ -1,7 +1,7 @@
 from math import sin
-from os import path
 
 import pygame
+from audio import audio_bank
 from settings import (
     COLLISION_OFFSET,
     DAMAGE_FORCE,
@@ -13,17 +13,27 @@ from settings import (
     PLAYER_SPEED,
 )
 from sprites import Animated
-from timer import Timer
+from timer import Timer, get_ticks
+
+# input is read through here, so recorded sessions can be played back
+key_source = pygame.key.get_pressed
+
+
+def set_key_source(source):
+    global key_source
+    key_source = source
 
 
 class Player(Animated):
+    can_sleep = False
+
     def __init__(
-        self, position, animations, groups, collision_sprites, status="idle_right"
+        self, position, animations, groups, collision_world, status="idle_right"
     ):
         super().__init__(
             position, animations, groups, status, "bottomleft", "player", True
         )
-        self.collision_sprites = collision_sprites
+        self.collision_world = collision_world
         self.speed = PLAYER_SPEED
         self.on_floor = False
         self.direction = pygame.Vector2()
@@ -31,15 +41,12 @@ class Player(Animated):
         self.hitbox = self.rect.inflate(*PLAYER_HITBOX_OFFSET)
         self.health = PLAYER_HEALTH
         self.invulnerability_timer = Timer(PLAYER_INVULNERABILITY_DURATION)
-        jump_sound_path = path.join("..", "audio", "jump.wav")
-        self.jump_sound = pygame.mixer.Sound(jump_sound_path)
-        self.jump_sound.set_volume(0.3)
-        hit_sound_path = path.join("..", "audio", "hit.wav")
-        self.hit_sound = pygame.mixer.Sound(hit_sound_path)
-        self.hit_sound.set_volume(0.5)
+        self.flicker_frames = {}
+        self.jump_sound = audio_bank.get_sound("jump.wav", 0.3)
+        self.hit_sound = audio_bank.get_sound("hit.wav", 0.5)
 
     def input(self):
-        keys = pygame.key.get_pressed()
+        keys = key_source()
 
         # movement
         if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
@@ -90,74 +97,70 @@ class Player(Animated):
     def check_on_floor(self):
         self.on_floor = self.sprite_down_collide() is not None
 
+    def get_nearby_hitboxes(self, probe_rect):
+        area = probe_rect.inflate(COLLISION_OFFSET * 2, COLLISION_OFFSET * 2)
+        return self.collision_world.get_hitboxes(area)
+
     def sprite_left_collide(self):
         left_rect = pygame.Rect(
             self.hitbox.topleft, (COLLISION_OFFSET, self.hitbox.height)
         )
-        for sprite in self.collision_sprites:
-            sprite_rect = pygame.Rect(
-                sprite.hitbox.topright, (COLLISION_OFFSET, sprite.hitbox.height)
-            )
-            if sprite_rect.colliderect(left_rect):
-                return sprite
+        for hitbox in self.get_nearby_hitboxes(left_rect):
+            edge_rect = pygame.Rect(hitbox.topright, (COLLISION_OFFSET, hitbox.height))
+            if edge_rect.colliderect(left_rect):
+                return hitbox
         return None
 
     def sprite_right_collide(self):
         right_rect = pygame.Rect(
             self.hitbox.topright, (COLLISION_OFFSET, self.hitbox.height)
         )
-        for sprite in self.collision_sprites:
-            sprite_rect = pygame.Rect(
-                sprite.hitbox.topleft, (COLLISION_OFFSET, sprite.hitbox.height)
-            )
-            if sprite_rect.colliderect(right_rect):
-                return sprite
+        for hitbox in self.get_nearby_hitboxes(right_rect):
+            edge_rect = pygame.Rect(hitbox.topleft, (COLLISION_OFFSET, hitbox.height))
+            if edge_rect.colliderect(right_rect):
+                return hitbox
         return None
 
     def sprite_up_collide(self):
         up_rect = pygame.Rect(
             self.hitbox.topleft, (self.hitbox.width, COLLISION_OFFSET * 2)
         )
-        for sprite in self.collision_sprites:
-            sprite_rect = pygame.Rect(
-                sprite.hitbox.bottomleft, (sprite.hitbox.width, COLLISION_OFFSET)
-            )
-            if sprite_rect.colliderect(up_rect):
-                return sprite
+        for hitbox in self.get_nearby_hitboxes(up_rect):
+            edge_rect = pygame.Rect(hitbox.bottomleft, (hitbox.width, COLLISION_OFFSET))
+            if edge_rect.colliderect(up_rect):
+                return hitbox
         return None
 
     def sprite_down_collide(self):
         down_rect = pygame.Rect(
             self.hitbox.bottomleft, (self.hitbox.width, COLLISION_OFFSET)
         )
-        for sprite in self.collision_sprites:
-            sprite_rect = pygame.Rect(
-                sprite.hitbox.topleft, (sprite.hitbox.width, COLLISION_OFFSET)
-            )
-            if sprite_rect.colliderect(down_rect):
-                return sprite
+        for hitbox in self.get_nearby_hitboxes(down_rect):
+            edge_rect = pygame.Rect(hitbox.topleft, (hitbox.width, COLLISION_OFFSET))
+            if edge_rect.colliderect(down_rect):
+                return hitbox
         return None
 
     def horizontal_collide(self):
         if self.direction.x > 0:  # moving right
-            sprite = self.sprite_right_collide()
-            if sprite:
-                self.hitbox.right = sprite.hitbox.left
+            hitbox = self.sprite_right_collide()
+            if hitbox is not None:
+                self.hitbox.right = hitbox.left
         elif self.direction.x < 0:  # moving left
-            sprite = self.sprite_left_collide()
-            if sprite:
-                self.hitbox.left = sprite.hitbox.right
+            hitbox = self.sprite_left_collide()
+            if hitbox is not None:
+                self.hitbox.left = hitbox.right
 
     def vertical_collide(self):
         if self.direction.y > 0:  # moving down
-            sprite = self.sprite_down_collide()
-            if sprite:
-                self.hitbox.bottom = sprite.hitbox.top
+            hitbox = self.sprite_down_collide()
+            if hitbox is not None:
+                self.hitbox.bottom = hitbox.top
                 self.direction.y = 0
         elif self.direction.y < 0:  # moving up
-            sprite = self.sprite_up_collide()
-            if sprite:
-                self.hitbox.top = sprite.hitbox.bottom
+            hitbox = self.sprite_up_collide()
+            if hitbox is not None:
+                self.hitbox.top = hitbox.bottom
                 self.direction.y = 0
 
     def take_damage(self, damage):
@@ -172,16 +175,23 @@ class Player(Animated):
                 self.direction.y = DAMAGE_FORCE
 
     def flicker_alpha_value(self):
-        if sin(pygame.time.get_ticks()) > 0:
+        if sin(get_ticks()) > 0:
             return 255
         else:
             return 0
 
-    def make_invulnerable(self):
-        self.image.set_alpha(self.flicker_alpha_value())
+    def get_flicker_frame(self, frame):
+        # frames are shared with the editor, so each one is copied once to fade it
+        if frame not in self.flicker_frames:
+            flicker_frame = frame.copy()
+            flicker_frame.set_alpha(0)
+            self.flicker_frames[frame] = flicker_frame
+        return self.flicker_frames[frame]
 
-    def make_vulnerable(self):
-        self.image.set_alpha(255)
+    def make_invulnerable(self):
+        # animate() has already picked the shared frame for this update
+        if self.flicker_alpha_value() == 0:
+            self.image = self.get_flicker_frame(self.image)
 
     def update_timers(self):
         self.invulnerability_timer.update()
@@ -198,5 +208,3 @@ class Player(Animated):
         if self.invulnerability_timer.active:
             self.invulnerability_timer.update()
             self.make_invulnerable()
-        else:
-            self.make_vulnerable()
@@ -0,0 +1,115 @@
+import cProfile
+import datetime
+import io
+import json
+import os
+import pstats
+from os import path
+
+from settings import PROFILE_FRAMES
+
+
+class Counters:
+    def __init__(self):
+        self.sources = {}
+
+    def register(self, name, source):
+        # registering a name again replaces its source
+        self.sources[name] = source
+
+    def unregister(self, prefix):
+        # drops a single counter or every counter of a subsystem, e.g. "level"
+        for name in list(self.sources):
+            if name == prefix or name.startswith(f"{prefix}."):
+                del self.sources[name]
+
+    def read(self):
+        return {name: source() for name, source in self.sources.items()}
+
+
+class Profiler:
+    def __init__(self, counters, folder=path.join("..", "profiles")):
+        self.counters = counters
+        self.folder = folder
+        self.profile = None
+        self.file_name = None
+        self.frames_left = 0
+        self.frame_count = 0
+        self.counter_stats = {}
+
+    @property
+    def active(self):
+        return self.profile is not None
+
+    def start(self, mode, level_name=None, frames=PROFILE_FRAMES):
+        self.stop()
+        date = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        name = "_".join(filter(None, ["profile", mode, level_name, date]))
+        self.file_name = path.join(self.folder, name)
+        self.frames_left = frames
+        self.frame_count = 0
+        self.counter_stats = {}
+        print(f"Profiling {frames} frames of the {mode}.")
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def toggle(self, mode, level_name=None, frames=PROFILE_FRAMES):
+        if self.active:
+            self.stop()
+        else:
+            self.start(mode, level_name, frames)
+
+    def sample_counters(self):
+        for name, value in self.counters.read().items():
+            if name in self.counter_stats:
+                stats = self.counter_stats[name]
+                stats["total"] += value
+                stats["min"] = min(stats["min"], value)
+                stats["max"] = max(stats["max"], value)
+            else:
+                self.counter_stats[name] = {"total": value, "min": value, "max": value}
+
+    def update(self):
+        if not self.active:
+            return
+        self.sample_counters()
+        self.frame_count += 1
+        self.frames_left -= 1
+        if self.frames_left <= 0:
+            self.stop()
+
+    def stop(self):
+        if not self.active:
+            return
+        self.profile.disable()
+        os.makedirs(self.folder, exist_ok=True)
+        self.profile.dump_stats(f"{self.file_name}.prof")
+
+        frame_count = max(self.frame_count, 1)
+        counters = {
+            name: {
+                "mean": stats["total"] / frame_count,
+                "min": stats["min"],
+                "max": stats["max"],
+            }
+            for name, stats in self.counter_stats.items()
+        }
+        with open(f"{self.file_name}_counters.json", "w") as file:
+            json.dump(
+                {"frames": self.frame_count, "counters": counters}, file, indent=2
+            )
+
+        report = io.StringIO()
+        pstats.Stats(self.profile, stream=report).sort_stats("cumulative").print_stats(
+            15
+        )
+        print(report.getvalue())
+        for name, stats in counters.items():
+            print(f"{name}: mean {stats['mean']:.1f}, max {stats['max']}")
+        print(
+            f"Saved the profile of {self.frame_count} frames to {self.file_name}.prof."
+        )
+        self.profile = None
+
+
+counters = Counters()
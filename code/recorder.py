@@ -0,0 +1,77 @@
+import datetime
+import json
+import os
+from os import path
+
+import pygame
+
+RECORDED_KEYS = (pygame.K_RIGHT, pygame.K_d, pygame.K_LEFT, pygame.K_a, pygame.K_SPACE)
+
+
+class KeyState:
+    def __init__(self, pressed=()):
+        self.pressed = set(pressed)
+
+    # stands in for the sequence pygame.key.get_pressed() returns
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+def get_player_state(level):
+    player = level.player
+    return [player.hitbox.x, player.hitbox.y, player.health]
+
+
+class InputRecorder:
+    def __init__(self, folder=path.join("..", "replays")):
+        self.folder = folder
+        self.keys = KeyState()
+        self.level = None
+        self.start_ticks = 0
+        self.frames = []
+        self.trace = []
+
+    def get_keys(self):
+        return self.keys
+
+    def start(self, level, ticks):
+        self.stop()
+        self.level = level
+        self.start_ticks = ticks
+        self.frames = []
+        self.trace = []
+
+    def record_frame(self, dt, ticks):
+        keys = pygame.key.get_pressed()
+        self.keys = KeyState(key for key in RECORDED_KEYS if keys[key])
+        if self.level:
+            self.frames.append(
+                [
+                    dt,
+                    ticks - self.start_ticks,
+                    self.level.paused,
+                    sorted(self.keys.pressed),
+                ]
+            )
+
+    def record_result(self):
+        if self.level:
+            self.trace.append(get_player_state(self.level))
+
+    def stop(self):
+        if self.level and self.frames:
+            os.makedirs(self.folder, exist_ok=True)
+            current_date_time = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            file_name = path.join(self.folder, f"replay_{current_date_time}.json")
+            with open(file_name, "w") as file:
+                json.dump(
+                    {
+                        "seed": self.level.seed,
+                        "grid": repr(self.level.grid),
+                        "frames": self.frames,
+                        "trace": self.trace,
+                    },
+                    file,
+                )
+            print(f"Recorded {len(self.frames)} frames to {file_name}.")
+        self.level = None
@@ -0,0 +1,77 @@
+import argparse
+import ast
+import json
+from time import perf_counter
+
+from headless import HeadlessRunner, load_grid
+from player import set_key_source
+from recorder import KeyState, get_player_state
+
+
+def load_recording(file_name):
+    with open(file_name, "r") as file:
+        return json.load(file)
+
+
+def play_recording(runner, recording, grid=None):
+    keys = KeyState()
+    set_key_source(lambda: keys)
+    start_ticks = runner.clock.get_ticks()
+    level = runner.load_level(
+        ast.literal_eval(recording["grid"]) if grid is None else grid,
+        seed=recording["seed"],
+    )
+    trace = []
+    for dt, ticks, paused, pressed in recording["frames"]:
+        keys.pressed = set(pressed)
+        # timers see the same time they saw while the session was recorded
+        runner.clock.ticks = start_ticks + ticks
+        if level.paused != paused:
+            level.toggle_pause()
+        level.update(dt)
+        trace.append(get_player_state(level))
+    return trace
+
+
+def compare_traces(recorded, replayed):
+    for frame, (expected, actual) in enumerate(zip(recorded, replayed)):
+        if expected != actual:
+            return frame
+    if len(recorded) != len(replayed):
+        return min(len(recorded), len(replayed))
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded level session")
+    parser.add_argument("recording", help="file written by main.py --record")
+    parser.add_argument("--level", help="replay against this level file instead")
+    parser.add_argument("--render", action="store_true", help="draw every frame")
+    args = parser.parse_args()
+
+    runner = HeadlessRunner(render=args.render)
+    recording = load_recording(args.recording)
+    grid = load_grid(args.level) if args.level else None
+    start = perf_counter()
+    trace = play_recording(runner, recording, grid)
+    elapsed = perf_counter() - start
+    print(
+        f"Replayed {len(trace)} frames in {elapsed:.2f} s "
+        f"({len(trace) / elapsed:.0f} frames/s)."
+    )
+    frame = compare_traces(recording["trace"], trace)
+    if frame is None:
+        print(f"Player trace matches the recording, final state {trace[-1]}.")
+    else:
+        expected = (
+            recording["trace"][frame] if frame < len(recording["trace"]) else None
+        )
+        actual = trace[frame] if frame < len(trace) else None
+        print(
+            f"Player trace diverges at frame {frame}: "
+            f"recorded {expected}, replayed {actual}."
+        )
+
+
+if __name__ == "__main__":
+    main()
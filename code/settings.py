@@ -1,5 +1,9 @@
+from os import path
+
 # general setup
 FPS = 60
+SIMULATION_RATE = 60
+MAX_SIMULATION_STEPS = 5
 TILE_SIZE = 64
 ANIMATION_SPEED = 8
 PLAYER_SPEED = 300
@@ -14,10 +18,47 @@ INITIAL_CLOUDS_CENTER = 20
 INITIAL_CLOUDS_RIGHT = 10
 INITIAL_CLOUDS_LEFT = 50
 INITIAL_CLOUDS_LEVEL = 40
+CLOUD_INTERVAL = 2000
+ACTIVITY_RADIUS = 1500
+ACTIVITY_CHECK_INTERVAL = 250
+MUSIC_FADE_DURATION = 800
+
+# rendering
+CULLING_CELL_SIZE = TILE_SIZE * 4
+CULLING_MARGIN = TILE_SIZE
+TERRAIN_CHUNK_SIZE = 16
+TERRAIN_CHUNK_CACHE_SIZE = 32
+
+# frame stats
+FRAME_STATS_HISTORY = 240
+FRAME_GRAPH_BAR_WIDTH = 2
+FRAME_GRAPH_HEIGHT = 160
+FRAME_GRAPH_SCALE = 4  # pixels per millisecond
+FRAME_GRAPH_COLORS = [
+    "#e6194b",
+    "#3cb44b",
+    "#ffe119",
+    "#4363d8",
+    "#f58231",
+    "#911eb4",
+    "#42d4f4",
+    "#f032e6",
+    "#bfef45",
+    "#fabed4",
+]
+FRAME_GRAPH_OTHER_COLOR = "#808080"
+PROFILE_FRAMES = 300
+METRICS_FLUSH_INTERVAL = 1
+
+# assets
+ASSET_LOADER_WORKERS = 8
+ASSET_PACK_PATH = path.join("..", "cache", "assets.pack")
+ATLAS_MAX_WIDTH = 2048
 
 # colors
 BUTTON_BG_COLOR = "#33323d"
 BUTTON_LINE_COLOR = "gold"
+COLORKEY = "#ff00ff"
 HORIZON_COLOR = "#f5f1de"
 HORIZON_TOP_COLOR = "#d1aa9d"
 HOVER_COLOR = "black"
@@ -0,0 +1,52 @@
+from settings import TILE_SIZE
+
+
+class SpatialHash:
+    def __init__(self, cell_size=TILE_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.sprite_cells = {}
+        self.sprite_order = {}
+        self.next_order = 0
+
+    def get_cells(self, rect):
+        left = rect.left // self.cell_size
+        right = (rect.right - 1) // self.cell_size
+        top = rect.top // self.cell_size
+        bottom = (rect.bottom - 1) // self.cell_size
+        return [
+            (col, row)
+            for col in range(left, right + 1)
+            for row in range(top, bottom + 1)
+        ]
+
+    def add(self, sprite, rect=None):
+        if sprite in self.sprite_cells:
+            self.remove(sprite)
+        cells = self.get_cells(sprite.hitbox if rect is None else rect)
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(sprite)
+        self.sprite_cells[sprite] = cells
+        self.sprite_order[sprite] = self.next_order
+        self.next_order += 1
+
+    def remove(self, sprite):
+        for cell in self.sprite_cells.pop(sprite, []):
+            self.cells[cell].discard(sprite)
+            if not self.cells[cell]:
+                del self.cells[cell]
+        self.sprite_order.pop(sprite, None)
+
+    def query(self, rect):
+        found = set()
+        for cell in self.get_cells(rect):
+            if cell in self.cells:
+                found.update(self.cells[cell])
+        # keep insertion order so results match iterating the original group
+        return sorted(found, key=self.sprite_order.get)
+
+    def __contains__(self, sprite):
+        return sprite in self.sprite_cells
+
+    def __len__(self):
+        return len(self.sprite_cells)
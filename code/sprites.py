@@ -1,29 +1,21 @@
-from os import path
-
 import pygame
+from audio import audio_bank
 from settings import ANIMATION_SPEED, TILE_SIZE
 from timer import Timer
+from utils import get_mask
 
 
 class Generic(pygame.sprite.Sprite):
+    static = True
+
     def __init__(self, position, surface, groups, sorting_layer="main"):
+        # render groups bucket sprites by layer as soon as they are added
+        self.sorting_layer = sorting_layer
         super().__init__(groups)
         self.position = position
         self.image = surface
         self.rect = self.image.get_rect(topleft=self.position)
         self.hitbox = self.rect
-        self.sorting_layer = sorting_layer
-
-    def draw_hitbox(self, surface, player):
-        window_width = surface.get_width()
-        window_height = surface.get_height()
-        offset = pygame.Vector2(
-            player.rect.centerx - window_width / 2,
-            player.rect.centery - window_height / 2,
-        )
-        offset_rect = self.hitbox.copy()
-        offset_rect.center -= offset
-        pygame.draw.rect(surface, "red", offset_rect, 2)
 
 
 class Mask(Generic):
@@ -32,6 +24,9 @@ class Mask(Generic):
 
 
 class Animated(Generic):
+    static = False
+    can_sleep = True
+
     def __init__(
         self,
         position,
@@ -62,7 +57,7 @@ class Animated(Generic):
             self.rect = self.image.get_rect(topleft=self.position)
         self.hitbox = self.rect
         if has_mask:
-            self.mask = pygame.mask.from_surface(self.image)
+            self.mask = get_mask(self.image)
         else:
             self.mask = None
 
@@ -72,14 +67,55 @@ class Animated(Generic):
             self.frame_index = 0
         self.image = self.frames[self.status][int(self.frame_index)]
         if self.mask is not None:
-            self.mask = pygame.mask.from_surface(self.image)
+            self.mask = get_mask(self.image)
         self.rect = self.image.get_rect(center=self.hitbox.center)
 
+    def get_timers(self):
+        return [value for value in vars(self).values() if isinstance(value, Timer)]
+
+    def sleep(self):
+        for timer in self.get_timers():
+            timer.pause()
+
+    def wake(self):
+        for timer in self.get_timers():
+            timer.resume()
+
     def update(self, dt):
         self.animate(dt)
 
 
+class ClockedAnimated(Animated):
+    static = True
+
+    def __init__(self, position, clock, groups, pivot="center", sorting_layer="main"):
+        self.clock = clock
+        super().__init__(
+            position, {"idle": clock.frames}, groups, "idle", pivot, sorting_layer
+        )
+
+    # the current frame always comes from the shared clock, so these sprites
+    # never need their own update() call
+    @property
+    def image(self):
+        return self.clock.image
+
+    @image.setter
+    def image(self, surface):
+        pass
+
+    @property
+    def mask(self):
+        return get_mask(self.clock.image)
+
+    @mask.setter
+    def mask(self, mask):
+        pass
+
+
 class Cloud(Animated):
+    can_sleep = False
+
     def __init__(self, position, surface, groups, left_limit, speed):
         super().__init__(position, {"idle": [surface]}, groups, sorting_layer="cloud")
         self.left_limit = left_limit
@@ -97,13 +133,11 @@ class Cloud(Animated):
             super().update(dt)
 
 
-class Coin(Animated):
-    def __init__(self, coin_type, position, frames, groups):
-        super().__init__(position, frames, groups)
+class Coin(ClockedAnimated):
+    def __init__(self, coin_type, position, clock, groups):
+        super().__init__(position, clock, groups)
         self.coin_type = coin_type
-        coin_sound_path = path.join("..", "audio", "coin.wav")
-        self.coin_sound = pygame.mixer.Sound(coin_sound_path)
-        self.coin_sound.set_volume(0.3)
+        self.coin_sound = audio_bank.get_sound("coin.wav", 0.3)
 
     def play_sound(self):
         self.coin_sound.play()
@@ -131,28 +165,25 @@ class Particle(Animated):
         super().update(dt)
 
 
-class Water(Animated):
-    def __init__(self, water_type, position, frames, groups):
-        super().__init__(
-            position, frames, groups, pivot="topleft", sorting_layer="water"
-        )
+class Water(ClockedAnimated):
+    def __init__(self, water_type, position, clock, groups):
+        super().__init__(position, clock, groups, "topleft", "water")
         self.water_type = water_type
 
 
-class AnimatedObject(Animated):
+class AnimatedObject(ClockedAnimated):
     def __init__(
         self,
         object_type,
         object_subtype,
         position,
-        frames,
+        clock,
         groups,
-        status="idle",
         background=False,
         pivot="topleft",
         sorting_layer="main",
     ):
-        super().__init__(position, frames, groups, status, pivot, sorting_layer)
+        super().__init__(position, clock, groups, pivot, sorting_layer)
         self.object_type = object_type
         self.object_subtype = object_subtype
         self.background = background
@@ -0,0 +1,78 @@
+import pygame
+from settings import COLORKEY
+
+# from the fastest to blit to the slowest
+ALPHA_CLASSES = ("opaque", "colorkey", "alpha")
+
+
+def classify_alpha(surface):
+    width, height = surface.get_size()
+    opaque_mask = pygame.mask.from_surface(surface, 254)
+    opaque_count = opaque_mask.count()
+    if opaque_count == width * height:
+        return "opaque"
+    # every pixel has to be either fully opaque or fully transparent
+    if opaque_count != pygame.mask.from_surface(surface, 0).count():
+        return "alpha"
+    # an opaque pixel in the colorkey itself would turn transparent
+    key_mask = pygame.mask.from_threshold(
+        surface, pygame.Color(COLORKEY), (1, 1, 1, 255)
+    )
+    if key_mask.overlap_area(opaque_mask, (0, 0)):
+        return "alpha"
+    return "colorkey"
+
+
+def get_alpha_class(surface):
+    if surface.get_flags() & pygame.SRCALPHA:
+        return "alpha"
+    if surface.get_colorkey() is not None:
+        return "colorkey"
+    return "opaque"
+
+
+def combine_alpha_classes(alpha_classes):
+    return max(alpha_classes, key=ALPHA_CLASSES.index, default="opaque")
+
+
+def create_surface(size, alpha_class):
+    if alpha_class == "alpha":
+        return pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+    surface = pygame.Surface(size).convert()
+    if alpha_class == "colorkey":
+        surface.fill(COLORKEY)
+        surface.set_colorkey(COLORKEY)
+    return surface
+
+
+def copy_pixels(destination, blit_sequence):
+    # nothing overlaps, so per pixel alpha is merged into the cleared surface
+    # instead of blended, and colorkey or opaque sources are blitted as is
+    destination.blits(
+        [
+            (
+                surface,
+                position,
+                None,
+                (pygame.BLEND_RGBA_MAX if surface.get_flags() & pygame.SRCALPHA else 0),
+            )
+            for surface, position in blit_sequence
+        ],
+        doreturn=False,
+    )
+
+
+def enable_rle(surface):
+    # run length encoding skips the transparent runs when blitting
+    surface.set_colorkey(surface.get_colorkey(), pygame.RLEACCEL)
+
+
+def convert_for_blit(surface, alpha_class):
+    if alpha_class == "opaque":
+        return surface.convert()
+    if alpha_class == "colorkey":
+        converted = create_surface(surface.get_size(), alpha_class)
+        converted.blit(surface, (0, 0))
+        enable_rle(converted)
+        return converted
+    return surface.convert_alpha()
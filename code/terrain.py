@@ -0,0 +1,76 @@
+from collections import OrderedDict
+
+from settings import TERRAIN_CHUNK_CACHE_SIZE, TERRAIN_CHUNK_SIZE, TILE_SIZE
+from surface_format import (
+    combine_alpha_classes,
+    copy_pixels,
+    create_surface,
+    enable_rle,
+    get_alpha_class,
+)
+
+
+class TerrainChunks:
+    def __init__(self, tiles, sorting_layer="main", chunk_size=TERRAIN_CHUNK_SIZE):
+        self.sorting_layer = sorting_layer
+        self.chunk_pixels = chunk_size * TILE_SIZE
+        self.chunk_tiles = {}
+        for position, surface in tiles.items():
+            x, y = int(position[0]), int(position[1])
+            key = (x // self.chunk_pixels, y // self.chunk_pixels)
+            self.chunk_tiles.setdefault(key, []).append(((x, y), surface))
+        self.baked_chunks = OrderedDict()
+        self.bake_count = 0
+
+    def bake_chunk(self, key):
+        tiles = self.chunk_tiles[key]
+        rect = (
+            tiles[0][1]
+            .get_rect(topleft=tiles[0][0])
+            .unionall(
+                [surface.get_rect(topleft=position) for position, surface in tiles[1:]]
+            )
+        )
+        alpha_class = combine_alpha_classes(
+            get_alpha_class(tile_surface) for _, tile_surface in tiles
+        )
+        covered_area = sum(
+            tile_surface.get_width() * tile_surface.get_height()
+            for _, tile_surface in tiles
+        )
+        # gaps between the tiles have to stay transparent
+        if alpha_class == "opaque" and covered_area < rect.width * rect.height:
+            alpha_class = "colorkey"
+        surface = create_surface(rect.size, alpha_class)
+        copy_pixels(
+            surface,
+            [
+                (tile_surface, (position[0] - rect.x, position[1] - rect.y))
+                for position, tile_surface in tiles
+            ],
+        )
+        if alpha_class == "colorkey":
+            enable_rle(surface)
+        self.bake_count += 1
+        return surface, rect.topleft
+
+    def get_chunk(self, key):
+        if key in self.baked_chunks:
+            self.baked_chunks.move_to_end(key)
+        else:
+            self.baked_chunks[key] = self.bake_chunk(key)
+            if len(self.baked_chunks) > TERRAIN_CHUNK_CACHE_SIZE:
+                self.baked_chunks.popitem(last=False)
+        return self.baked_chunks[key]
+
+    def get_visible_chunks(self, camera_rect):
+        left = camera_rect.left // self.chunk_pixels
+        right = camera_rect.right // self.chunk_pixels
+        top = camera_rect.top // self.chunk_pixels
+        bottom = camera_rect.bottom // self.chunk_pixels
+        return [
+            self.get_chunk((col, row))
+            for row in range(top, bottom + 1)
+            for col in range(left, right + 1)
+            if (col, row) in self.chunk_tiles
+        ]
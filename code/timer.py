@@ -1,25 +1,60 @@
 import pygame
 
+# timers read the time through here, so headless runs can simulate it
+time_source = pygame.time.get_ticks
+
+
+def get_ticks():
+    return time_source()
+
+
+def set_time_source(source):
+    global time_source
+    time_source = source
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.ticks = 0.0
+
+    def advance(self, dt):
+        self.ticks += dt * 1000
+
+    def get_ticks(self):
+        return int(self.ticks)
+
 
 class Timer:
     def __init__(self, duration, func=None):
         self.duration = duration
         self.func = func
         self.start_time = 0
+        self.pause_time = None
         self.active = False
 
     def activate(self):
         self.active = True
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = get_ticks()
+        self.pause_time = None
 
     def deactivate(self):
         self.active = False
         self.start_time = 0
 
+    def pause(self):
+        if self.active and self.pause_time is None:
+            self.pause_time = get_ticks()
+
+    def resume(self):
+        if self.pause_time is not None:
+            # shift the start so the time spent paused does not count
+            self.start_time += get_ticks() - self.pause_time
+            self.pause_time = None
+
     def update(self):
-        if not self.active:
+        if not self.active or self.pause_time is not None:
             return
-        current_time = pygame.time.get_ticks()
+        current_time = get_ticks()
         if current_time - self.start_time >= self.duration:
             self.deactivate()
             if self.func:
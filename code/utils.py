@@ -1,45 +1,78 @@
 from os import path, walk
+from weakref import WeakKeyDictionary
 
 import pygame
+from asset_loader import asset_loader
+
+# masks only depend on the frame surface, so they are shared by every sprite
+mask_cache = WeakKeyDictionary()
 
 
 def import_folder(folder):
     pathname = path.normpath(folder)
+    image_paths = [
+        path.join(dirpath, filename)
+        for dirpath, _, filenames in walk(pathname)
+        for filename in sorted(filenames)
+    ]
+    asset_loader.preload(image_paths)
+    asset_loader.pack_atlas(image_paths)
     image_surfaces = []
-    for dirpath, _, filenames in walk(pathname):
-        for filename in sorted(filenames):
-            full_path = path.join(dirpath, filename)
-            try:
-                image_surface = pygame.image.load(full_path).convert_alpha()
-                image_surfaces.append(image_surface)
-            except pygame.error:
-                pass
+    for full_path in image_paths:
+        try:
+            image_surface = asset_loader.load_image(full_path)
+            image_surfaces.append(image_surface)
+        except pygame.error:
+            pass
     return image_surfaces
 
 
 def import_folder_as_dict(folder):
     pathname = path.normpath(folder)
-    image_surfaces = {}
-    for dirpath, __, img_files in walk(pathname):
-        for image in img_files:
-            full_path = path.join(dirpath, image)
-            image_surface = pygame.image.load(full_path).convert_alpha()
-            image_surfaces[image.split(".")[0]] = image_surface
-
-    return image_surfaces
+    image_paths = {
+        image.split(".")[0]: path.join(dirpath, image)
+        for dirpath, __, img_files in walk(pathname)
+        for image in img_files
+    }
+    asset_loader.preload(image_paths.values())
+    return {
+        name: asset_loader.load_image(full_path)
+        for name, full_path in image_paths.items()
+    }
 
 
 def import_subfolders_as_list(folder):
     pathname = path.normpath(folder)
-    image_surfaces = {}
+    image_paths = {}
     for dirpath, __, img_files in walk(pathname):
         if dirpath == pathname:
             continue
         dir_name = dirpath.split(path.sep)[-1]
-        image_surfaces[dir_name] = []
-        for image in img_files:
-            full_path = path.join(dirpath, image)
-            image_surface = pygame.image.load(full_path).convert_alpha()
-            image_surfaces[dir_name].append(image_surface)
+        image_paths[dir_name] = [path.join(dirpath, image) for image in img_files]
+    full_paths = [full_path for paths in image_paths.values() for full_path in paths]
+    asset_loader.preload(full_paths)
+    # every animation of an asset shares one sheet
+    asset_loader.pack_atlas(full_paths)
+    return {
+        dir_name: [asset_loader.load_image(full_path) for full_path in paths]
+        for dir_name, paths in image_paths.items()
+    }
 
-    return image_surfaces
+
+def get_mask(surface):
+    mask = mask_cache.get(surface)
+    if mask is None:
+        mask = pygame.mask.from_surface(surface)
+        mask_cache[surface] = mask
+    return mask
+
+
+def cache_masks(assets):
+    if isinstance(assets, pygame.Surface):
+        get_mask(assets)
+    elif isinstance(assets, dict):
+        for value in assets.values():
+            cache_masks(value)
+    elif isinstance(assets, list):
+        for value in assets:
+            cache_masks(value)